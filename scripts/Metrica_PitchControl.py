@@ -24,6 +24,13 @@ calculate_pitch_control_at_target(): calculate the pitch control probability for
 generate_pitch_control_for_event(): this function evaluates pitch control surface over the entire field at the moment
 of the given event (determined by the index of the event passed as an input)
 
+generate_pitch_control_for_players(): evaluates pitch control surface over the entire field for given lists of attacking and defending players
+
+calculate_pitch_control_at_targets(): calculate the pitch control probabilities at many target positions in one go
+
+calculate_ball_travel_times(), calculate_times_to_intercept() & integrate_pitch_control(): the steps of calculate_pitch_control_at_targets,
+so that the times of players that have not moved can be reused
+
 Classes
 ---------
 
@@ -35,6 +42,15 @@ The 'player' class collects and stores trajectory information for each player re
 
 import numpy as np
 
+try:
+    import numba
+except ImportError: # numba is optional, the model is integrated over tiles of cells with numpy without it
+    numba = None
+
+# number of targets integrated at once by the numpy implementation of integrate_pitch_control (i.e. a 16x16 tile of
+# the grid), small enough for the per-player arrays of a tile to stay in cache
+integration_tile_size = 256
+
 
 def initialise_players(team,teamname,params):
     """
@@ -66,6 +82,38 @@ def initialise_players(team,teamname,params):
             team_players.append(team_player)
     return team_players
 
+def initialise_players_from_arrays(player_ids,positions,velocities,teamname,params):
+    """
+    initialise_players_from_arrays(player_ids,positions,velocities,teamname,params)
+    
+    create a list of player objects from arrays holding the positions and velocities of a team's players at a given instant
+    (e.g. one frame of tracking data that has already been converted to numpy arrays)
+    
+    Parameters
+    -----------
+    
+    player_ids: ids (jersey numbers) of the players, in the order of the rows of positions & velocities
+    positions: (n_players,2) array of player positions. Players with a nan position are not on the pitch
+    velocities: (n_players,2) array of player velocities
+    teamname: team name "Home" or "Away"
+    params: Dictionary of model parameters (default model parameters can be generated using default_model_params() )
+        
+    Returns
+    -----------
+    
+    team_players: list of player objects for the team at at given instant
+    
+    """
+    team_players = []
+    for pid, position, velocity in zip(player_ids, positions, velocities):
+        # only the player's own values, rather than a row for the whole team that has to be searched for player ids
+        playername = "%s_%s_" % (teamname,pid)
+        row = {playername+'x': position[0], playername+'y': position[1], playername+'vx': velocity[0], playername+'vy': velocity[1]}
+        team_player = player(pid,row,teamname,params)
+        if team_player.inframe:
+            team_players.append(team_player)
+    return team_players
+
 class player(object):
     """
     player() class
@@ -184,25 +232,57 @@ def generate_pitch_control_for_event(event_id, events, df_dict, params, field_di
 
     """
     # get the details of the event (frame, team in possession, ball_start_position)
-    pass_frame = events.loc[event_id]['Start Frame']
-    pass_team = events.loc[event_id].Team
-    ball_start_pos = np.array([events.loc[event_id]['Start X'],events.loc[event_id]['Start Y']])
+    pass_frame = events.at[event_id,'Start Frame']
+    pass_team = events.at[event_id,'Team']
+    ball_start_pos = np.array([events.at[event_id,'Start X'],events.at[event_id,'Start Y']])
+    # initialise player positions and velocities for pitch control calc (so that we're not repeating this at each grid cell position)
+    not_pass_team = [team for team in df_dict.keys() if team != pass_team][0]
+    attacking_players = initialise_players(df_dict[pass_team].loc[pass_frame],pass_team,params)
+    defending_players = initialise_players(df_dict[not_pass_team].loc[pass_frame],not_pass_team,params)
+    return generate_pitch_control_for_players(attacking_players, defending_players, ball_start_pos, params, field_dimen=field_dimen, n_grid_cells_x=n_grid_cells_x)
+
+def generate_pitch_control_for_players(attacking_players, defending_players, ball_start_pos, params, field_dimen = (106.,68.,), n_grid_cells_x = 50, out = None):
+    """ generate_pitch_control_for_players
+    
+    Evaluates pitch control surface over the entire field for the given players (e.g. as returned by initialise_players
+    or initialise_players_from_arrays). This is what generate_pitch_control_for_event evaluates, once it has looked up
+    the players at the moment of the event.
+    
+    Parameters
+    -----------
+        attacking_players: list of 'player' objects (see player class above) for the players on the attacking team (team in possession)
+        defending_players: list of 'player' objects (see player class above) for the players on the defending team
+        ball_start_pos: Current position of the ball (start position for a pass). If set to NaN, function will assume that the ball is already at the target position.
+        params: Dictionary of model parameters (default model parameters can be generated using default_model_params() )
+        field_dimen: tuple containing the length and width of the pitch in meters. Default is (106,68)
+        n_grid_cells_x: Number of pixels in the grid (in the x-direction) that covers the surface. Default is 50.
+                        n_grid_cells_y will be calculated based on n_grid_cells_x and the field dimensions
+        out: Optional float64 array (dimen (n_grid_cells_y,n_grid_cells_x) ) that PPCFa is written into, e.g. to reuse the
+             same array when evaluating many surfaces. Default is None (a new array is allocated)
+        
+    Returrns
+    -----------
+        PPCFa: Pitch control surface (dimen (n_grid_cells_x,n_grid_cells_y) ) containing pitch control probability for the attcking team.
+               Surface for the defending team is just 1-PPCFa.
+        xgrid: Positions of the pixels in the x-direction (field length)
+        ygrid: Positions of the pixels in the y-direction (field width)
+
+    """
     # break the pitch down into a grid
     n_grid_cells_y = int(n_grid_cells_x*field_dimen[1]/field_dimen[0])
     xgrid = np.linspace( -field_dimen[0]/2., field_dimen[0]/2., n_grid_cells_x)
     ygrid = np.linspace( -field_dimen[1]/2., field_dimen[1]/2., n_grid_cells_y )
     # initialise pitch control grids for attacking and defending teams 
-    PPCFa = np.zeros( shape = (len(ygrid), len(xgrid)) )
+    if out is None:
+        PPCFa = np.zeros( shape = (len(ygrid), len(xgrid)) )
+    else:
+        assert out.shape == (len(ygrid), len(xgrid)) and out.dtype == np.float64 and out.flags.c_contiguous, "out must be a C-contiguous float64 array of shape %s" % ((len(ygrid), len(xgrid)),)
+        PPCFa = out
     PPCFd = np.zeros( shape = (len(ygrid), len(xgrid)) )
-    # initialise player positions and velocities for pitch control calc (so that we're not repeating this at each grid cell position)
-    not_pass_team = [team for team in df_dict.keys() if team != pass_team][0]
-    attacking_players = initialise_players(df_dict[pass_team].loc[pass_frame],pass_team,params)
-    defending_players = initialise_players(df_dict[not_pass_team].loc[pass_frame],not_pass_team,params)
     # calculate pitch pitch control model at each location on the pitch
-    for i in range( len(ygrid) ):
-        for j in range( len(xgrid) ):
-            target_position = np.array( [xgrid[j], ygrid[i]] )
-            PPCFa[i,j],PPCFd[i,j] = calculate_pitch_control_at_target(target_position, attacking_players, defending_players, ball_start_pos, params)
+    # (evaluating every cell in one call, row-major so that the results fill PPCFa & PPCFd in place)
+    target_positions = np.column_stack( [np.tile(xgrid,len(ygrid)), np.repeat(ygrid,len(xgrid))] )
+    calculate_pitch_control_at_targets(target_positions, attacking_players, defending_players, ball_start_pos, params, out=(PPCFa.ravel(),PPCFd.ravel()))
     # check probabilitiy sums within convergence
     checksum = np.sum( PPCFa + PPCFd ) / float(n_grid_cells_y*n_grid_cells_x ) 
     assert 1-checksum < params['model_converge_tol'], "Checksum failed: %1.3f" % (1-checksum)
@@ -279,3 +359,217 @@ def calculate_pitch_control_at_target(target_position, attacking_players, defend
             print("Integration failed to converge: %1.3f" % (ptot) )
         return PPCFatt[i-1], PPCFdef[i-1]
 
+def calculate_pitch_control_at_targets(target_positions, attacking_players, defending_players, ball_start_pos, params, out=None):
+    """ calculate_pitch_control_at_targets
+    
+    Calculates the pitch control probability for the attacking and defending teams at each of the given target positions,
+    giving the same result as calling calculate_pitch_control_at_target for each of them. The times to intercept of every
+    player are worked out for all of the targets at once, and the model is then integrated by integrate_pitch_control.
+    
+    Parameters
+    -----------
+        target_positions: (n_targets,2) numpy array containing the (x,y) positions on the field to evaluate pitch control
+        attacking_players: list of 'player' objects (see player class above) for the players on the attacking team (team in possession)
+        defending_players: list of 'player' objects (see player class above) for the players on the defending team
+        ball_start_pos: Current position of the ball (start position for a pass). If set to NaN, function will assume that the ball is already at the target position.
+        params: Dictionary of model parameters (default model parameters can be generated using default_model_params() )
+        out: Optional tuple of two float64 (n_targets,) arrays that PPCFatt and PPCFdef are written into. Default is None
+        
+    Returrns
+    -----------
+        PPCFatt: (n_targets,) array of pitch control probabilities for the attacking team
+        PPCFdef: (n_targets,) array of pitch control probabilities for the defending team
+
+    """
+    ball_travel_time = calculate_ball_travel_times(target_positions, ball_start_pos, params)
+    tti_att, sigma_att = calculate_times_to_intercept(target_positions, attacking_players)
+    tti_def, sigma_def = calculate_times_to_intercept(target_positions, defending_players)
+    return integrate_pitch_control(tti_att, sigma_att, tti_def, sigma_def, ball_travel_time, params, out=out)
+
+def calculate_ball_travel_times(target_positions, ball_start_pos, params):
+    """ calculate_ball_travel_times
+    
+    Time taken by the ball to travel from its start position to each of the target positions (at the average ball speed).
+    If ball_start_pos is None or NaN, the ball is assumed to already be at each target and the times are all 0.
+    
+    """
+    if ball_start_pos is None or any(np.isnan(ball_start_pos)): # assume that ball is already at location
+        return np.zeros( len(target_positions) )
+    return np.linalg.norm( target_positions - ball_start_pos, axis=1 )/params['average_ball_speed']
+
+def calculate_times_to_intercept(target_positions, players):
+    """ calculate_times_to_intercept
+    
+    Times taken by each of the players to reach each of the target positions (see player.simple_time_to_intercept).
+    
+    Returns
+    -----------
+        tti: (n_players,n_targets) array of times to intercept
+        tti_sigma: (n_players,) array of the players' tti_sigma
+    
+    """
+    position = np.array( [p.position for p in players], dtype=float ).reshape(-1,2)
+    velocity = np.array( [p.velocity for p in players], dtype=float ).reshape(-1,2)
+    reaction_time = np.array( [p.reaction_time for p in players], dtype=float )
+    vmax = np.array( [p.vmax for p in players], dtype=float )
+    r_reaction = position + velocity*reaction_time[:,None]
+    distance = np.linalg.norm( target_positions[None,:,:] - r_reaction[:,None,:], axis=2 )
+    tti = reaction_time[:,None] + distance/vmax[:,None]
+    return tti, np.array( [p.tti_sigma for p in players], dtype=float )
+
+def integrate_pitch_control(tti_att, sigma_att, tti_def, sigma_def, ball_travel_time, params, out=None):
+    """ integrate_pitch_control
+    
+    Solves the pitch control model at each target from the players' times to intercept and the ball travel times (as
+    returned by calculate_times_to_intercept and calculate_ball_travel_times). Keeping these separate allows the times of
+    players that do not change to be reused between calls. The integration is done by a compiled kernel when numba is
+    installed, and over tiles of integration_tile_size targets with numpy otherwise.
+    
+    Parameters
+    -----------
+        tti_att, tti_def: (n_players,n_targets) arrays of times to intercept for the attacking and defending players
+        sigma_att, sigma_def: (n_players,) arrays of the attacking and defending players' tti_sigma
+        ball_travel_time: (n_targets,) array of ball travel times
+        params: Dictionary of model parameters (default model parameters can be generated using default_model_params() )
+        out: Optional tuple of two float64 (n_targets,) arrays that PPCFatt and PPCFdef are written into. Default is None
+        
+    Returrns
+    -----------
+        PPCFatt: (n_targets,) array of pitch control probabilities for the attacking team
+        PPCFdef: (n_targets,) array of pitch control probabilities for the defending team
+    
+    """
+    if out is None:
+        out = ( np.zeros(len(ball_travel_time)), np.zeros(len(ball_travel_time)) )
+    # status of each target: 0 if the integration converged, 1 if it did not, 2 if a player's probability was invalid
+    status = np.zeros(len(ball_travel_time), dtype=np.int8)
+    _integrate_pitch_control(tti_att, tti_def, sigma_att, sigma_def, ball_travel_time,
+                             params['lambda_att'], params['lambda_def'], params['time_to_control_att'], params['time_to_control_def'],
+                             params['int_dt'], params['max_int_time'], params['model_converge_tol'], out[0], out[1], status)
+    assert not np.any(status == 2), 'Invalid player probability (integrate_pitch_control)'
+    for ptot in (out[0]+out[1])[status == 1]:
+        print("Integration failed to converge: %1.3f" % (ptot) )
+    return out
+
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _integrate_target(t, tti_att, tti_def, sigma_att, sigma_def, ball_travel_time, tau_min_att, tau_min_def, lambda_att, lambda_def,
+                          time_to_control_att, time_to_control_def, int_dt, max_int_time, model_converge_tol, status):
+        """ integrates equation 3 of Spearman 2018 at target t, returning (PPCFatt, PPCFdef) """
+        # contributions of the individual players (allocated per target, as the targets run in parallel)
+        player_att = np.zeros(tti_att.shape[0])
+        player_def = np.zeros(tti_def.shape[0])
+        dT_array = np.arange(ball_travel_time-int_dt,ball_travel_time+max_int_time,int_dt)
+        PPCFatt_prev = 0.
+        PPCFdef_prev = 0.
+        ptot = 0.0
+        i = 1
+        while 1-ptot>model_converge_tol and i<dT_array.size:
+            T = dT_array[i]
+            PPCFatt_i = 0.
+            PPCFdef_i = 0.
+            for k in range(tti_att.shape[0]):
+                # players that are far (in time) from the target location are ignored
+                if tti_att[k,t]-tau_min_att < time_to_control_att:
+                    f = 1/(1. + np.exp( -np.pi/np.sqrt(3.0)/sigma_att[k] * (T-tti_att[k,t]) ) )
+                    dPPCFdT = (1-PPCFatt_prev-PPCFdef_prev)*f*lambda_att
+                    if dPPCFdT<0:
+                        status[t] = 2
+                    player_att[k] += dPPCFdT*int_dt
+                    PPCFatt_i += player_att[k]
+            for k in range(tti_def.shape[0]):
+                if tti_def[k,t]-tau_min_def < time_to_control_def:
+                    f = 1/(1. + np.exp( -np.pi/np.sqrt(3.0)/sigma_def[k] * (T-tti_def[k,t]) ) )
+                    dPPCFdT = (1-PPCFatt_prev-PPCFdef_prev)*f*lambda_def
+                    if dPPCFdT<0:
+                        status[t] = 2
+                    player_def[k] += dPPCFdT*int_dt
+                    PPCFdef_i += player_def[k]
+            PPCFatt_prev = PPCFatt_i
+            PPCFdef_prev = PPCFdef_i
+            ptot = PPCFdef_i+PPCFatt_i
+            i += 1
+        if i>=dT_array.size and status[t] == 0:
+            status[t] = 1
+        return PPCFatt_prev, PPCFdef_prev
+
+    @numba.njit(parallel=True, cache=True)
+    def _integrate_pitch_control(tti_att, tti_def, sigma_att, sigma_def, ball_travel_time, lambda_att, lambda_def,
+                                 time_to_control_att, time_to_control_def, int_dt, max_int_time, model_converge_tol, PPCFa, PPCFd, status):
+        """ compiled version of the shortcuts & integration in calculate_pitch_control_at_target, with the targets split over the cores,
+        written into PPCFa, PPCFd & status (there's no assert or print, which would stop numba running the loop in parallel) """
+        n_targets = ball_travel_time.size
+        for t in numba.prange(n_targets):
+            tau_min_att = np.inf
+            for k in range(tti_att.shape[0]):
+                tau_min_att = min(tau_min_att, tti_att[k,t])
+            tau_min_def = np.inf
+            for k in range(tti_def.shape[0]):
+                tau_min_def = min(tau_min_def, tti_def[k,t])
+            # check whether we actually need to solve equation 3
+            if tau_min_att-max(ball_travel_time[t],tau_min_def) >= time_to_control_def:
+                PPCFa[t], PPCFd[t] = 0., 1.
+            elif tau_min_def-max(ball_travel_time[t],tau_min_att) >= time_to_control_att:
+                PPCFa[t], PPCFd[t] = 1., 0.
+            else:
+                PPCFa[t], PPCFd[t] = _integrate_target(t, tti_att, tti_def, sigma_att, sigma_def, ball_travel_time[t], tau_min_att, tau_min_def,
+                                                       lambda_att, lambda_def, time_to_control_att, time_to_control_def, int_dt, max_int_time,
+                                                       model_converge_tol, status)
+
+else:
+
+    def _integrate_pitch_control(tti_att, tti_def, sigma_att, sigma_def, ball_travel_time, lambda_att, lambda_def,
+                                 time_to_control_att, time_to_control_def, int_dt, max_int_time, model_converge_tol, PPCFa, PPCFd, status):
+        """ numpy version of the shortcuts & integration in calculate_pitch_control_at_target, vectorised over tiles of targets """
+        for start in range(0, ball_travel_time.size, integration_tile_size):
+            tile = slice(start, start+integration_tile_size)
+            _integrate_tile(tti_att[:,tile], tti_def[:,tile], sigma_att, sigma_def, ball_travel_time[tile], lambda_att, lambda_def,
+                            time_to_control_att, time_to_control_def, int_dt, max_int_time, model_converge_tol, PPCFa[tile], PPCFd[tile], status[tile])
+
+def _integrate_tile(tti_att, tti_def, sigma_att, sigma_def, ball_travel_time, lambda_att, lambda_def,
+                    time_to_control_att, time_to_control_def, int_dt, max_int_time, model_converge_tol, PPCFa, PPCFd, status):
+    """ integrates the model at every target of a tile at once, writing the results into PPCFa, PPCFd & status """
+    tau_min_att = np.min(tti_att, axis=0, initial=np.inf)
+    tau_min_def = np.min(tti_def, axis=0, initial=np.inf)
+    # check whether we actually need to solve equation 3
+    defending_control = tau_min_att-np.maximum(ball_travel_time,tau_min_def) >= time_to_control_def
+    attacking_control = ~defending_control & (tau_min_def-np.maximum(ball_travel_time,tau_min_att) >= time_to_control_att)
+    PPCFa[defending_control], PPCFd[defending_control] = 0., 1.
+    PPCFa[attacking_control], PPCFd[attacking_control] = 1., 0.
+    solve = np.flatnonzero( ~(defending_control | attacking_control) )
+    if solve.size == 0:
+        return
+    tti_att, tti_def, ball_travel_time = tti_att[:,solve], tti_def[:,solve], ball_travel_time[solve]
+    # players that are far (in time) from the target location are ignored
+    near_att = tti_att-tau_min_att[solve] < time_to_control_att
+    near_def = tti_def-tau_min_def[solve] < time_to_control_def
+    # logistic slope of each player, and the number of steps of the integration time array for each target
+    slope_att = (-np.pi/np.sqrt(3.0)/sigma_att)[:,None]
+    slope_def = (-np.pi/np.sqrt(3.0)/sigma_def)[:,None]
+    n_steps = np.ceil( ((ball_travel_time+max_int_time) - (ball_travel_time-int_dt))/int_dt ).astype(int)
+    player_att = np.zeros(tti_att.shape)
+    player_def = np.zeros(tti_def.shape)
+    PPCFatt = np.zeros(solve.size)
+    PPCFdef = np.zeros(solve.size)
+    ptot = np.zeros(solve.size)
+    i = 1
+    running = (1-ptot>model_converge_tol) & (i<n_steps)
+    while running.any():
+        T = ball_travel_time-int_dt + i*int_dt
+        # the probability left to take is the same for every player in the time interval
+        remaining = 1-PPCFatt-PPCFdef
+        dPPCFdT_att = remaining*lambda_att/(1. + np.exp( slope_att * (T-tti_att) ))
+        dPPCFdT_def = remaining*lambda_def/(1. + np.exp( slope_def * (T-tti_def) ))
+        invalid = running & ( np.any(dPPCFdT_att<0, axis=0) | np.any(dPPCFdT_def<0, axis=0) )
+        player_att += dPPCFdT_att*int_dt*(near_att & running)
+        player_def += dPPCFdT_def*int_dt*(near_def & running)
+        PPCFatt = np.where(running, player_att.sum(axis=0), PPCFatt)
+        PPCFdef = np.where(running, player_def.sum(axis=0), PPCFdef)
+        ptot = np.where(running, PPCFatt+PPCFdef, ptot)
+        i += 1
+        # targets that have converged (or run out of integration time) keep their values
+        status[solve[invalid]] = 2
+        status[solve[running & (i>=n_steps) & (status[solve]==0)]] = 1
+        running &= (1-ptot>model_converge_tol) & (i<n_steps)
+    PPCFa[solve], PPCFd[solve] = PPCFatt, PPCFdef
@@ -12,14 +12,114 @@ The majority of code in this file can be found from the following Github repo:
 https://github.com/Friends-of-Tracking-Data-FoTD/LaurieOnTracking
 """
 
+import multiprocessing
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
 import matplotlib.pyplot as plt
 import numpy as np
 import matplotlib.animation as animation
+from matplotlib.collections import LineCollection
 from matplotlib.colors import LinearSegmentedColormap
 import matplotlib.patches as mpatches
 
+try:
+    import numba
+except ImportError: # numba is optional, the numpy implementations below are used without it
+    numba = None
+
 twitter_color = "#141d26"
 
+# ALL DIMENSIONS IN m
+border_dimen = (3,3) # include a border arround of the field of width 3m
+meters_per_yard = 0.9144 # unit conversion from yards to meters
+# Soccer field dimensions typically defined in yards, so we need to convert to meters
+goal_line_width = 8*meters_per_yard
+box_width = 20*meters_per_yard
+box_length = 6*meters_per_yard
+area_width = 44*meters_per_yard
+area_length = 18*meters_per_yard
+penalty_spot = 12*meters_per_yard
+corner_radius = 1*meters_per_yard
+D_length = 8*meters_per_yard
+D_radius = 10*meters_per_yard
+D_pos = 12*meters_per_yard
+centre_circle_radius = 10*meters_per_yard
+
+# ffmpeg settings that favour encoding speed (the artists are cheap to update, so the encoder would otherwise dominate)
+clip_codec = 'libx264'
+clip_extra_args = ['-preset','ultrafast','-pix_fmt','yuv420p','-tune','fastdecode','-threads','0']
+
+@lru_cache(maxsize=8)
+def _pitch_segments(field_dimen):
+    """ _pitch_segments( field_dimen )
+    
+    Computes the straight pitch markings (boundary, boxes, areas and half way line) as line segments.
+    The geometry only depends on the field dimensions, so it is cached and shared between calls to plot_pitch.
+    
+    Parameters
+    -----------
+        field_dimen: (length, width) of field in meters, as a (hashable) tuple
+        
+    Returrns
+    -----------
+       segments : read-only (N,2,2) array of line segments [[x0,y0],[x1,y1]]
+
+    """
+    half_pitch_length = field_dimen[0]/2. # length of half pitch
+    half_pitch_width = field_dimen[1]/2. # width of half pitch
+    signs = [-1,1] 
+    # half way line
+    lines = [ [[0,-half_pitch_width],[0,half_pitch_width]] ]
+    for s in signs: # each side of the pitch
+        # pitch boundary
+        lines.append( [[-half_pitch_length,s*half_pitch_width],[half_pitch_length,s*half_pitch_width]] )
+        lines.append( [[s*half_pitch_length,-half_pitch_width],[s*half_pitch_length,half_pitch_width]] )
+        # 6 yard box
+        lines.append( [[s*half_pitch_length,box_width/2.],[s*half_pitch_length-s*box_length,box_width/2.]] )
+        lines.append( [[s*half_pitch_length,-box_width/2.],[s*half_pitch_length-s*box_length,-box_width/2.]] )
+        lines.append( [[s*half_pitch_length-s*box_length,-box_width/2.],[s*half_pitch_length-s*box_length,box_width/2.]] )
+        # penalty area
+        lines.append( [[s*half_pitch_length,area_width/2.],[s*half_pitch_length-s*area_length,area_width/2.]] )
+        lines.append( [[s*half_pitch_length,-area_width/2.],[s*half_pitch_length-s*area_length,-area_width/2.]] )
+        lines.append( [[s*half_pitch_length-s*area_length,-area_width/2.],[s*half_pitch_length-s*area_length,area_width/2.]] )
+    segments = np.array(lines, dtype=float)
+    segments.flags.writeable = False # shared between calls
+    return segments
+
+@lru_cache(maxsize=8)
+def _pitch_arcs(field_dimen):
+    """ _pitch_arcs( field_dimen )
+    
+    Computes the curved pitch markings (centre circle, corner arcs and the D) as the parameters of matplotlib Arc patches.
+    Patches can not be shared between axes, so only their parameters are cached.
+    
+    Parameters
+    -----------
+        field_dimen: (length, width) of field in meters, as a (hashable) tuple
+        
+    Returrns
+    -----------
+       arcs : tuple of (centre, radius, theta1, theta2), with the angles in degrees
+
+    """
+    half_pitch_length = field_dimen[0]/2. # length of half pitch
+    half_pitch_width = field_dimen[1]/2. # width of half pitch
+    D_angle = np.degrees( np.arcsin(D_length/D_radius) ) # D_length is half the chord of the circle that defines the D
+    arcs = [ ((0.,0.), centre_circle_radius, 0., 360.) ] # center circle
+    for s in [-1,1]: # each side of the pitch, the arcs face the inside of the pitch
+        # corner flags
+        for t in [-1,1]:
+            corner_centre = np.degrees( np.arctan2(-t,-s) ) # direction of the centre of the pitch, as seen from the corner
+            arcs.append( ((s*half_pitch_length,t*half_pitch_width), corner_radius, corner_centre-45., corner_centre+45.) )
+        # the D
+        D_centre = 90.+s*90. # direction of the centre of the pitch, as seen from the penalty spot
+        arcs.append( ((s*half_pitch_length-s*D_pos,0.), D_radius, D_centre-D_angle, D_centre+D_angle) )
+    return tuple(arcs)
+
 def plot_pitch( field_dimen = (106.0,68.0), field_color ='green', linewidth=2, markersize=20):
     """ plot_pitch
     
@@ -56,57 +156,20 @@ def plot_pitch( field_dimen = (106.0,68.0), field_color ='green', linewidth=2, m
         print(f'{field_color} does not exist in setting...')
         exit()
 
-    # ALL DIMENSIONS IN m
-    border_dimen = (3,3) # include a border arround of the field of width 3m
-    meters_per_yard = 0.9144 # unit conversion from yards to meters
     half_pitch_length = field_dimen[0]/2. # length of half pitch
     half_pitch_width = field_dimen[1]/2. # width of half pitch
     signs = [-1,1] 
-    # Soccer field dimensions typically defined in yards, so we need to convert to meters
-    goal_line_width = 8*meters_per_yard
-    box_width = 20*meters_per_yard
-    box_length = 6*meters_per_yard
-    area_width = 44*meters_per_yard
-    area_length = 18*meters_per_yard
-    penalty_spot = 12*meters_per_yard
-    corner_radius = 1*meters_per_yard
-    D_length = 8*meters_per_yard
-    D_radius = 10*meters_per_yard
-    D_pos = 12*meters_per_yard
-    centre_circle_radius = 10*meters_per_yard
-    # plot half way line # center circle
-    ax.plot([0,0],[-half_pitch_width,half_pitch_width],lc,linewidth=linewidth)
-    ax.scatter(0.0,0.0,marker='o',facecolor=lc,linewidth=0,s=markersize)
-    y = np.linspace(-1,1,50)*centre_circle_radius
-    x = np.sqrt(centre_circle_radius**2-y**2)
-    ax.plot(x,y,lc,linewidth=linewidth)
-    ax.plot(-x,y,lc,linewidth=linewidth)
-    for s in signs: # plots each line seperately
-        # plot pitch boundary
-        ax.plot([-half_pitch_length,half_pitch_length],[s*half_pitch_width,s*half_pitch_width],lc,linewidth=linewidth)
-        ax.plot([s*half_pitch_length,s*half_pitch_length],[-half_pitch_width,half_pitch_width],lc,linewidth=linewidth)
-        # goal posts & line
-        ax.plot( [s*half_pitch_length,s*half_pitch_length],[-goal_line_width/2.,goal_line_width/2.],pc+'s',markersize=6*markersize/20.,linewidth=linewidth)
-        # 6 yard box
-        ax.plot([s*half_pitch_length,s*half_pitch_length-s*box_length],[box_width/2.,box_width/2.],lc,linewidth=linewidth)
-        ax.plot([s*half_pitch_length,s*half_pitch_length-s*box_length],[-box_width/2.,-box_width/2.],lc,linewidth=linewidth)
-        ax.plot([s*half_pitch_length-s*box_length,s*half_pitch_length-s*box_length],[-box_width/2.,box_width/2.],lc,linewidth=linewidth)
-        # penalty area
-        ax.plot([s*half_pitch_length,s*half_pitch_length-s*area_length],[area_width/2.,area_width/2.],lc,linewidth=linewidth)
-        ax.plot([s*half_pitch_length,s*half_pitch_length-s*area_length],[-area_width/2.,-area_width/2.],lc,linewidth=linewidth)
-        ax.plot([s*half_pitch_length-s*area_length,s*half_pitch_length-s*area_length],[-area_width/2.,area_width/2.],lc,linewidth=linewidth)
-        # penalty spot
-        ax.scatter(s*half_pitch_length-s*penalty_spot,0.0,marker='o',facecolor=lc,linewidth=0,s=markersize)
-        # corner flags
-        y = np.linspace(0,1,50)*corner_radius
-        x = np.sqrt(corner_radius**2-y**2)
-        ax.plot(s*half_pitch_length-s*x,-half_pitch_width+y,lc,linewidth=linewidth)
-        ax.plot(s*half_pitch_length-s*x,half_pitch_width-y,lc,linewidth=linewidth)
-        # draw the D
-        y = np.linspace(-1,1,50)*D_length # D_length is the chord of the circle that defines the D
-        x = np.sqrt(D_radius**2-y**2)+D_pos
-        ax.plot(s*half_pitch_length-s*x,y,lc,linewidth=linewidth)
-        
+    # plot the straight pitch lines as a single collection, and the arcs as (exact) patches
+    ax.add_collection( LineCollection(_pitch_segments(tuple(field_dimen)), colors=lc, linewidths=linewidth) )
+    for centre, radius, theta1, theta2 in _pitch_arcs(tuple(field_dimen)):
+        ax.add_patch( mpatches.Arc(centre, 2*radius, 2*radius, theta1=theta1, theta2=theta2, color=lc, linewidth=linewidth) )
+    # centre & penalty spots
+    spots = np.array( [[0.,0.]] + [[s*half_pitch_length-s*penalty_spot,0.] for s in signs] )
+    ax.scatter(spots[:,0],spots[:,1],marker='o',facecolor=lc,linewidth=0,s=markersize)
+    # goal posts of both goals
+    posts = np.array( [[s*half_pitch_length,t*goal_line_width/2.] for s in signs for t in signs] )
+    ax.scatter(posts[:,0],posts[:,1],marker='s',color=pc,linewidth=1,s=(6*markersize/20.)**2) # scatter sizes are in points^2
+
     # remove axis labels and ticks
     ax.spines['top'].set_visible(False); ax.spines['bottom'].set_visible(False)
     ax.spines['left'].set_visible(False); ax.spines['right'].set_visible(False)
@@ -123,7 +186,71 @@ def plot_pitch( field_dimen = (106.0,68.0), field_color ='green', linewidth=2, m
 
     return fig,ax
 
-def plot_frame(df_dict, figax=None, team_color_dict={'Home':'r','Away':'b'}, field_dimen = (106.0,68.0), include_player_velocities=False, PlayerMarkerSize=10, PlayerAlpha=0.7, annotate=False ):
+def _player_column_positions(team, include_player_velocities=False):
+    """ _player_column_positions( team )
+    
+    Finds the positions of the player columns of a tracking data frame (or of one of its rows), so that they can be 
+    read with plain numpy indexing instead of being looked up by label for every frame.
+    
+    Parameters
+    -----------
+        team: tracking data frame of a team, or a row (i.e. instant) of it
+        include_player_velocities: Boolean variable that determines whether the velocity columns are also looked up. Default is False
+        
+    Returrns
+    -----------
+       x_idx, y_idx, vx_idx, vy_idx : integer arrays with the column positions of the player x/y positions and x/y velocities
+                                      (all in the same player order). vx_idx & vy_idx are None if velocities are not included
+
+    """
+    columns = team.keys()
+    x_columns = [c for c in columns if c[-2:].lower()=='_x' and c!='ball_x'] # column header for player x positions
+    y_columns = [c for c in columns if c[-2:].lower()=='_y' and c!='ball_y'] # column header for player y positions
+    x_idx = np.array([columns.get_loc(c) for c in x_columns], dtype=int)
+    y_idx = np.array([columns.get_loc(c) for c in y_columns], dtype=int)
+    vx_idx, vy_idx = None, None
+    if include_player_velocities:
+        vx_idx = np.array([columns.get_loc('{}_vx'.format(c[:-2])) for c in x_columns], dtype=int) # column header for player x velocities
+        vy_idx = np.array([columns.get_loc('{}_vy'.format(c[:-2])) for c in y_columns], dtype=int) # column header for player y velocities
+    return x_idx, y_idx, vx_idx, vy_idx
+
+def _get_artists(ax, gid):
+    """ _get_artists( ax, gid )
+    
+    Returns the artists of the axes that were tagged with the given gid by a previous plotting call (e.g. plot_frame),
+    so that they can be updated or removed rather than drawn again.
+    """
+    return [artist for artist in ax.get_children() if artist.get_gid()==gid]
+
+@lru_cache(maxsize=8)
+def _legend_handles(team_colors):
+    """ _legend_handles( team_colors )
+    
+    Returns the legend handles for a tuple of (team_name, color) pairs. They are only used as templates by the legend,
+    so the same handles are shared between figures.
+    """
+    return [mpatches.Patch(color=color, label=team_name) for team_name, color in team_colors]
+
+def _team_legend(ax, team_color_dict, loc='best'):
+    """ _team_legend( ax, team_color_dict, loc='best' )
+    
+    Adds the legend of the team colors to the axes. Clips pass a fixed loc, as 'best' would search for a position
+    every time the figure is drawn (i.e. for every frame of the clip) and make the legend jump around.
+    """
+    return ax.legend(handles=_legend_handles(tuple(team_color_dict.items())), fontsize=12, title='Team', loc=loc)
+
+@lru_cache(maxsize=16)
+def _pitch_control_cmap(possession_team, team_colors):
+    """ _pitch_control_cmap( possession_team, team_colors )
+    
+    Returns the colormap of the pitch control surface, from the color of the defending team through white to the color
+    of the team in possession. team_colors is a tuple of (team_name, color) pairs. The colormap is shared between calls,
+    so it should be copied before being modified (e.g. with set_bad).
+    """
+    team_color_dict = dict(team_colors)
+    return LinearSegmentedColormap.from_list("pitch_control", [color for team, color in team_color_dict.items() if team != possession_team] + ["white", team_color_dict[possession_team]])
+
+def plot_frame(df_dict, figax=None, team_color_dict={'Home':'r','Away':'b'}, field_dimen = (106.0,68.0), include_player_velocities=False, PlayerMarkerSize=10, PlayerAlpha=0.7, annotate=False, update_artists=False ):
     """ plot_frame( hometeam, awayteam )
     
     Plots a frame of Metrica tracking data (player positions and the ball) on a football pitch. All distances should be in meters.
@@ -138,6 +265,7 @@ def plot_frame(df_dict, figax=None, team_color_dict={'Home':'r','Away':'b'}, fie
         PlayerMarkerSize: size of the individual player marlers. Default is 10
         PlayerAlpha: alpha (transparency) of player markers. Defaault is 0.7
         annotate: Boolean variable that determines with player jersey numbers are added to the plot (default is False)
+        update_artists: Boolean variable that determines whether the players and ball drawn by a previous call on the same axes are moved to this frame, rather than plotted again (default is False)
         
     Returrns
     -----------
@@ -151,23 +279,136 @@ def plot_frame(df_dict, figax=None, team_color_dict={'Home':'r','Away':'b'}, fie
     # plot home & away teams in order
     for team_name in df_dict.keys():
         team, color = df_dict[team_name], team_color_dict[team_name]
-        x_columns = [c for c in team.keys() if c[-2:].lower()=='_x' and c!='ball_x'] # column header for player x positions
-        y_columns = [c for c in team.keys() if c[-2:].lower()=='_y' and c!='ball_y'] # column header for player y positions
-        ax.plot( team[x_columns], team[y_columns], color=color, marker='o', MarkerSize=PlayerMarkerSize, linestyle='None', alpha=PlayerAlpha ) # plot player positions
+        x_idx, y_idx, vx_idx, vy_idx = _player_column_positions(team, include_player_velocities)
+        values = team.values
+        xs, ys = values[...,x_idx], values[...,y_idx]
+        players = _get_artists(ax, team_name+'_players') if update_artists else []
+        if players:
+            players[0].set_data( xs, ys )
+        else:
+            ax.plot( xs, ys, color=color, marker='o', markersize=PlayerMarkerSize, linestyle='None', alpha=PlayerAlpha, gid=team_name+'_players' ) # plot player positions
         if include_player_velocities:
-            vx_columns = ['{}_vx'.format(c[:-2]) for c in x_columns] # column header for player x positions
-            vy_columns = ['{}_vy'.format(c[:-2]) for c in y_columns] # column header for player y positions
-            ax.quiver( team[x_columns], team[y_columns], team[vx_columns], team[vy_columns], color=color, scale_units='inches', scale=10.,width=0.0015,headlength=5,headwidth=3,alpha=PlayerAlpha)
+            velocities = _get_artists(ax, team_name+'_velocities') if update_artists else []
+            if velocities and velocities[0].N==len(xs):
+                velocities[0].set_offsets( np.c_[xs, ys] )
+                velocities[0].set_UVC( values[...,vx_idx], values[...,vy_idx] )
+            else:
+                [velocity.remove() for velocity in velocities]
+                ax.quiver( xs, ys, values[...,vx_idx], values[...,vy_idx], color=color, scale_units='inches', scale=10.,width=0.0015,headlength=5,headwidth=3,alpha=PlayerAlpha, gid=team_name+'_velocities')
         if annotate:
-            [ax.text( team[x]+0.5, team[y]+0.5, x.split('_')[1], fontsize=10, color=color) for x,y in zip(x_columns,y_columns) if not (np.isnan(team[x]) or np.isnan(team[y]))] 
+            if update_artists: # the players on the pitch may have changed, so the labels are simply drawn again
+                [label.remove() for label in _get_artists(ax, team_name+'_labels')]
+            labels = [c.split('_')[1] for c in team.keys()[x_idx]] # jersey numbers
+            for k in np.flatnonzero( ~(np.isnan(xs) | np.isnan(ys)) ): # only the players on the pitch
+                ax.text( xs[k]+0.5, ys[k]+0.5, labels[k], fontsize=10, color=color, gid=team_name+'_labels')
     # plot ball
     team_name = list(df_dict.keys())[0]
-    ax.plot(df_dict[team_name]['ball_x'], df_dict[team_name]['ball_y'], color='yellow', marker='o', MarkerSize=6, alpha=1.0, LineWidth=0)
+    ball = _get_artists(ax, 'ball') if update_artists else []
+    if ball:
+        ball[0].set_data( [df_dict[team_name]['ball_x']], [df_dict[team_name]['ball_y']] )
+    else:
+        ax.plot(df_dict[team_name]['ball_x'], df_dict[team_name]['ball_y'], color='yellow', marker='o', markersize=6, alpha=1.0, linewidth=0, gid='ball')
     # set legend
-    ax.legend(handles=[mpatches.Patch(color=color, label=team_name) for team_name, color in team_color_dict.items()], fontsize=12, title='Team')
+    if not (update_artists and ax.get_legend() is not None):
+        _team_legend(ax, team_color_dict)
     return fig,ax
     
-def save_match_clip(df_dict, fpath, fname='clip_test', figax=None, frames_per_second=25, team_color_dict={'Home':'r','Away':'b'}, field_dimen = (106.0,68.0), annotate=False, include_player_velocities=False, PlayerMarkerSize=10, PlayerAlpha=0.7):
+def _ffmpeg_command(input_args, frames_per_second, fname):
+    """ _ffmpeg_command( input_args, frames_per_second, fname )
+    
+    Returns the ffmpeg command that encodes the frames read with input_args (e.g. ['-i', 'frame_%07d.png']) to the
+    movie fname, using the codec settings of the module.
+    """
+    return ( [plt.rcParams['animation.ffmpeg_path'], '-y', '-v', 'error', '-framerate', str(frames_per_second)] + input_args
+             + ['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-c:v', clip_codec] + clip_extra_args # yuv420p needs even frame sizes
+             + ['-metadata', 'title=Tracking Data', '-metadata', 'comment=Metrica tracking data clip', fname] )
+
+def _clip_arrays(df_dict, include_player_velocities=False):
+    """ _clip_arrays( df_dict )
+    
+    Extracts everything that save_match_clip needs from the tracking data frames as numpy arrays and strings, so that
+    it can also be sent to the processes rendering the frames.
+    
+    Returrns
+    -----------
+       teams : list of (team_name, values, x_idx, y_idx, vx_idx, vy_idx, jersey numbers), one per team
+       ball : (n_frames,3) array with the ball position and the match time of each frame
+
+    """
+    teams = []
+    for team_name, team in df_dict.items():
+        x_idx, y_idx, vx_idx, vy_idx = _player_column_positions(team, include_player_velocities) # looked up once, not per frame
+        labels = [c.split('_')[1] for c in team.columns[x_idx]]
+        teams.append( (team_name, team.to_numpy(dtype=np.float64), x_idx, y_idx, vx_idx, vy_idx, labels) ) # frames are read by position from the array
+    team = list(df_dict.values())[0]
+    ball = team[['ball_x','ball_y','Time [s]']].to_numpy(dtype=np.float64)
+    return teams, ball
+
+def _clip_artists(ax, teams, ball, team_color_dict, field_dimen, annotate, include_player_velocities, PlayerMarkerSize, PlayerAlpha, ball_trail, ball_start=0):
+    """ _clip_artists( ax, teams, ball, ... )
+    
+    Creates the artists of a match clip once and returns a function draw_frame(k) that moves them to the k'th frame
+    of teams and ball (as returned by _clip_arrays). ball may start ball_start frames before teams, so that the ball
+    trail of the first frames can also be drawn.
+    """
+    team_objs = []
+    for team_name, values, x_idx, y_idx, vx_idx, vy_idx, labels in teams:
+        color = team_color_dict[team_name]
+        players, = ax.plot( [], [], color=color, linestyle='None', marker='o', markersize=PlayerMarkerSize, alpha=PlayerAlpha ) # player positions
+        velocities, texts = None, []
+        if include_player_velocities:
+            dummy = np.zeros(len(x_idx))
+            velocities = ax.quiver( dummy, dummy, dummy, dummy, color=color, scale_units='inches', scale=10.,width=0.0015,headlength=5,headwidth=3,alpha=PlayerAlpha)
+        if annotate:
+            texts = [ax.text( 0., 0., label, fontsize=10, color=color, visible=False) for label in labels] # jersey numbers
+        team_objs.append( (values, x_idx, y_idx, vx_idx, vy_idx, players, velocities, texts) )
+    if ball_trail > 0:
+        trail, = ax.plot( [], [], color='yellow', linewidth=1.5, alpha=0.5) # path of the ball over the previous frames
+    ball_marker, = ax.plot( [], [], color='yellow', marker='o', markersize=6, alpha=1.0, linewidth=0)
+    time_text = ax.text(-2.5,field_dimen[1]/2.+1., '', fontsize=14, color='w') # match time at the top
+    # set legend (at a fixed location, so that it stays put between frames)
+    _team_legend(ax, team_color_dict, loc='upper right')
+
+    def draw_frame(k):
+        for values, x_idx, y_idx, vx_idx, vy_idx, players, velocities, texts in team_objs:
+            row = values[k]
+            xs, ys = row[x_idx], row[y_idx]
+            players.set_data( xs, ys ) # player positions
+            if include_player_velocities:
+                velocities.set_offsets( np.c_[xs, ys] )
+                velocities.set_UVC( row[vx_idx], row[vy_idx] )
+            if annotate:
+                on_pitch = ~(np.isnan(xs) | np.isnan(ys)) # hide the jersey numbers of players who are not on the pitch
+                for text, x, y, visible in zip(texts, xs, ys, on_pitch):
+                    text.set_visible( visible )
+                    text.set_position( (x+0.5, y+0.5) )
+        k += ball_start
+        # ball
+        if ball_trail > 0:
+            trail.set_data( ball[max(0,k-ball_trail):k+1,0], ball[max(0,k-ball_trail):k+1,1] )
+        ball_marker.set_data( ball[k:k+1,0], ball[k:k+1,1] )
+        frame_time = ball[k,2]
+        # match time
+        frame_minute =  int( frame_time/60. )
+        frame_second =  ( frame_time/60. - frame_minute ) * 60.
+        time_text.set_text( "%d:%1.2f" % ( frame_minute, frame_second  ) )
+    return draw_frame
+
+def _save_clip_frames(frame_dir, start, teams, ball, ball_start, field_color, team_color_dict, field_dimen, annotate, include_player_velocities, PlayerMarkerSize, PlayerAlpha, ball_trail):
+    """ _save_clip_frames( frame_dir, start, teams, ball, ball_start, ... )
+    
+    Renders a contiguous chunk of the frames of a match clip to frame_dir as numbered png files, starting from frame
+    number 'start'. Runs in a worker process of save_match_clip, so it draws its own pitch.
+    """
+    fig,ax = plot_pitch(field_dimen=field_dimen, field_color=field_color)
+    fig.set_tight_layout(True)
+    draw_frame = _clip_artists(ax, teams, ball, team_color_dict, field_dimen, annotate, include_player_velocities, PlayerMarkerSize, PlayerAlpha, ball_trail, ball_start)
+    for k in range(len(ball)-ball_start):
+        draw_frame(k)
+        fig.savefig( os.path.join(frame_dir, 'frame_%07d.png' % (start+k)), dpi=100, facecolor=fig.get_facecolor() )
+    plt.close(fig)
+
+def save_match_clip(df_dict, fpath, fname='clip_test', figax=None, frames_per_second=25, team_color_dict={'Home':'r','Away':'b'}, field_dimen = (106.0,68.0), annotate=False, include_player_velocities=False, PlayerMarkerSize=10, PlayerAlpha=0.7, n_jobs=1, field_color='green', ball_trail=0):
     """ save_match_clip( hometeam, awayteam, fpath )
     
     Generates a movie from Metrica tracking data, saving it in the 'fpath' directory with name 'fname'
@@ -185,6 +426,10 @@ def save_match_clip(df_dict, fpath, fname='clip_test', figax=None, frames_per_se
         include_player_velocities: Boolean variable that determines whether player velocities are also plotted (as quivers). Default is False
         PlayerMarkerSize: size of the individual player marlers. Default is 10
         PlayerAlpha: alpha (transparency) of player markers. Defaault is 0.7
+        n_jobs: number of processes rendering the frames (None uses all cores). With more than one, each process draws its own pitch
+            (so fig,ax can not be passed in) and the frames are encoded by ffmpeg once they have all been rendered. Default is 1
+        field_color: color of the pitch when it is generated here (see plot_pitch). Default is 'green'
+        ball_trail: number of previous frames over which the path of the ball is drawn behind it. Default is 0 (no trail)
         
     Returrns
     -----------
@@ -196,51 +441,79 @@ def save_match_clip(df_dict, fpath, fname='clip_test', figax=None, frames_per_se
     assert np.all( df_dict[team1].index==df_dict[team2].index ), "Home and away team Dataframe indices must be the same"
     # in which case use home team index
     index = df_dict[team1].index
-    # Set figure and movie settings
-    FFMpegWriter = animation.writers['ffmpeg']
-    metadata = dict(title='Tracking Data', artist='Matplotlib', comment='Metrica tracking data clip')
-    writer = FFMpegWriter(fps=frames_per_second, metadata=metadata)
+    n_jobs = min(os.cpu_count() if n_jobs is None else n_jobs, len(index))
+    assert n_jobs <= 1 or figax is None, "Figures can not be shared between processes, use field_color instead of figax when n_jobs > 1"
     fname = fpath + '/' +  fname + '.mp4' # path and filename
+    teams, ball = _clip_arrays(df_dict, include_player_velocities)
+    artist_kwargs = (team_color_dict, field_dimen, annotate, include_player_velocities, PlayerMarkerSize, PlayerAlpha, ball_trail)
+    print("Generating movie...",end='')
+    if n_jobs > 1:
+        # render contiguous chunks of frames in parallel, then encode them in one go
+        with tempfile.TemporaryDirectory() as frame_dir:
+            # spawn rather than fork the workers, forking after numba has started its threads can deadlock them
+            with ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context('spawn')) as executor:
+                futures = []
+                for chunk in np.array_split(np.arange(len(index)), n_jobs):
+                    chunk = slice(chunk[0], chunk[-1]+1)
+                    chunk_teams = [team[:1] + (team[1][chunk],) + team[2:] for team in teams] # workers only receive their own frames
+                    ball_start = min(chunk.start, ball_trail) # and the ball positions of the trail before them
+                    futures.append( executor.submit(_save_clip_frames, frame_dir, chunk.start, chunk_teams, ball[chunk.start-ball_start:chunk.stop], ball_start, field_color, *artist_kwargs) )
+                [future.result() for future in futures] # re-raises any error of the workers
+            subprocess.run( _ffmpeg_command(['-i', os.path.join(frame_dir, 'frame_%07d.png')], frames_per_second, fname), check=True )
+        print("done")
+        return
     # create football pitch
     if figax is None:
-        fig,ax = plot_pitch(field_dimen=field_dimen)
+        fig,ax = plot_pitch(field_dimen=field_dimen, field_color=field_color)
     else:
         fig,ax = figax
     fig.set_tight_layout(True)
+    # create the artists once, their data is then updated for each frame
+    static_artists = set(ax.get_children())
+    draw_frame = _clip_artists(ax, teams, ball, *artist_kwargs)
     # Generate movie
-    print("Generating movie...",end='')
-    with writer.saving(fig, fname, 100):
-        for i in index:
-            figobjs = [] # this is used to collect up all the axis objects so that they can be deleted after each iteration
-            for team_name in df_dict.keys():
-                team = df_dict[team_name].loc[i]
-                color = team_color_dict[team_name]
-                x_columns = [c for c in team.keys() if c[-2:].lower()=='_x' and c!='ball_x'] # column header for player x positions
-                y_columns = [c for c in team.keys() if c[-2:].lower()=='_y' and c!='ball_y'] # column header for player y positions
-                objs, = ax.plot( team[x_columns], team[y_columns], color=color, linestyle='None', marker='o', MarkerSize=PlayerMarkerSize, alpha=PlayerAlpha ) # plot player positions
-                figobjs.append(objs)
-                if include_player_velocities:
-                    vx_columns = ['{}_vx'.format(c[:-2]) for c in x_columns] # column header for player x positions
-                    vy_columns = ['{}_vy'.format(c[:-2]) for c in y_columns] # column header for player y positions
-                    objs = ax.quiver( team[x_columns], team[y_columns], team[vx_columns], team[vy_columns], color=color, scale_units='inches', scale=10.,width=0.0015,headlength=5,headwidth=3,alpha=PlayerAlpha)
-                    figobjs.append(objs)
-                if annotate:
-                    figobjs += [ax.text( team[x]+0.5, team[y]+0.5, x.split('_')[0], fontsize=10, color=color) for x,y in zip(x_columns,y_columns) if not (np.isnan(team[x]) or np.isnan(team[y]))]
-            # plot ball
-            objs, = ax.plot( team['ball_x'], team['ball_y'], color='yellow', marker='o', MarkerSize=6, alpha=1.0, LineWidth=0)
-            figobjs.append(objs)
-            # include match time at the top
-            frame_minute =  int( team['Time [s]']/60. )
-            frame_second =  ( team['Time [s]']/60. - frame_minute ) * 60.
-            timestring = "%d:%1.2f" % ( frame_minute, frame_second  )
-            objs = ax.text(-2.5,field_dimen[1]/2.+1., timestring, fontsize=14, color='w')
-            figobjs.append(objs)
-            # set legend
-            figobjs.append(ax.legend(handles=[mpatches.Patch(color=color, label=team_name) for team_name, color in team_color_dict.items()], fontsize=12, title='Team'))
-            writer.grab_frame()
-            # Delete all axis objects (other than pitch lines) in preperation for next frame
-            for figobj in figobjs:
-                figobj.remove()
+    if not fig.canvas.supports_blit: # e.g. vector backends, the whole figure is drawn for every frame
+        FFMpegWriter = animation.writers['ffmpeg']
+        metadata = dict(title='Tracking Data', artist='Matplotlib', comment='Metrica tracking data clip')
+        writer = FFMpegWriter(fps=frames_per_second, codec=clip_codec, extra_args=clip_extra_args, metadata=metadata)
+        with writer.saving(fig, fname, 100):
+            for k in range(len(index)):
+                draw_frame(k)
+                writer.grab_frame()
+    else:
+        # only the players, ball and time change between frames, so the pitch is drawn once and then copied back under
+        # them (the legend is redrawn though, as it lies on top of the players)
+        animated = sorted( [artist for artist in ax.get_children() if artist not in static_artists or artist is ax.get_legend()], key=lambda artist: artist.get_zorder() )
+        [artist.set_animated(True) for artist in animated]
+        dpi = fig.get_dpi() # the frames are rendered at 100 dpi, a passed in figure gets its own dpi back afterwards
+        fig.set_dpi(100)
+        ffmpeg = None
+        try:
+            draw_frame(0) # the layout of the pitch takes the (time) text of the first frame into account
+            fig.canvas.draw()
+            background = fig.canvas.copy_from_bbox(fig.bbox)
+            height, width = np.asarray(fig.canvas.buffer_rgba()).shape[:2]
+            ffmpeg = subprocess.Popen( _ffmpeg_command(['-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', '%dx%d' % (width, height), '-i', '-'], frames_per_second, fname), stdin=subprocess.PIPE )
+            for k in range(len(index)):
+                draw_frame(k)
+                fig.canvas.restore_region(background)
+                [ax.draw_artist(artist) for artist in animated]
+                ffmpeg.stdin.write( fig.canvas.buffer_rgba() )
+        except BaseException:
+            if ffmpeg is not None: # don't leave ffmpeg waiting for the rest of the frames
+                ffmpeg.kill()
+            raise
+        finally:
+            if ffmpeg is not None:
+                try:
+                    ffmpeg.stdin.close()
+                except BrokenPipeError: # ffmpeg was killed (or failed, which its return code reports)
+                    pass
+                ffmpeg.wait()
+            fig.set_dpi(dpi)
+            [artist.set_animated(False) for artist in animated]
+        if ffmpeg.returncode != 0:
+            raise subprocess.CalledProcessError(ffmpeg.returncode, ffmpeg.args)
     print("done")
     plt.clf()
     plt.close(fig)    
@@ -272,14 +545,16 @@ def plot_events( events, figax=None, field_dimen = (106.0,68), indicators = ['Ma
         fig,ax = plot_pitch( field_dimen = field_dimen )
     else: # overlay on a previously generated pitch
         fig,ax = figax 
-    for i,row in events.iterrows():
-        if 'Marker' in indicators:
-            ax.plot(  row['Start X'], row['Start Y'], color=color, marker=marker_style, alpha=alpha)
-        if 'Arrow' in indicators:
-            ax.annotate("", xy=row[['End X','End Y']], xytext=row[['Start X','Start Y']], alpha=alpha, arrowprops=dict(alpha=alpha,arrowstyle="->",color=color),annotation_clip=False)
-        if annotate:
-            textstring = row['Type'] + ': ' + row['From']
-            ax.text( row['Start X'], row['Start Y'], textstring, fontsize=10, color=color)
+    sx, sy = events['Start X'].to_numpy(dtype=float), events['Start Y'].to_numpy(dtype=float)
+    if 'Marker' in indicators:
+        ax.scatter( sx, sy, color=color, marker=marker_style, alpha=alpha, s=plt.rcParams['lines.markersize']**2 )
+    if 'Arrow' in indicators:
+        ex, ey = events['End X'].to_numpy(dtype=float), events['End Y'].to_numpy(dtype=float)
+        ax.quiver( sx, sy, ex-sx, ey-sy, color=color, alpha=alpha, angles='xy', scale_units='xy', scale=1, width=0.002 )
+    if annotate:
+        textstrings = events['Type'].astype(str) + ': ' + events['From'].astype(str)
+        for k in np.flatnonzero( ~(np.isnan(sx) | np.isnan(sy)) ): # only the events with a position
+            ax.text( sx[k], sy[k], textstrings.iloc[k], fontsize=10, color=color)
     return fig,ax
 
 # This function is modified from @EightyFivePoint's adaptation. However, there are no breaking changes,
@@ -306,7 +581,8 @@ def plot_pitchcontrol_for_event(
     player_y_velocity=0,
     alpha_pitch_control=0.5,
     team_color_dict={'Home':"r", 'Away':"b"},
-    field_color="white"
+    field_color="white",
+    figax=None,
 ):
     """ plot_pitchcontrol_for_event( event_id, events,  tracking_home, tracking_away, PPCF, xgrid, ygrid )
 
@@ -328,6 +604,8 @@ def plot_pitchcontrol_for_event(
         alpha_pitch_control: alpha (transparency) of spaces heatmap. Default is 0.5
         team_color_dict: 
         field_color: color of the field. Default is green.
+        fig,ax: Can be used to pass in the (fig,ax) objects returned by a previous call, in which case the pitch is not drawn
+            again and the players, event and pitch control surface of the previous call are updated. Default is None (new pitch plot)
 
     Returrns
     -----------
@@ -336,15 +614,20 @@ def plot_pitchcontrol_for_event(
     """
 
     # pick a pass at which to generate the pitch control surface
-    event_frame = events.loc[event_id]["Start Frame"]
+    event_frame = events.at[event_id, "Start Frame"]
 
-    possession_team = events.loc[event_id].Team
-    cmap = LinearSegmentedColormap.from_list("", [color for team, color in team_color_dict.items() if team != possession_team] + ["white", team_color_dict[possession_team]])
+    possession_team = events.at[event_id, "Team"]
+    cmap = _pitch_control_cmap(possession_team, tuple(team_color_dict.items()))
 
     tmp_df_dict = {team:df.loc[event_frame] for team, df in df_dict.items()}
 
     # plot frame and event
-    fig, ax = plot_pitch(field_color=field_color, field_dimen=field_dimen)
+    if figax is None:
+        fig, ax = plot_pitch(field_color=field_color, field_dimen=field_dimen)
+    else:
+        fig, ax = figax
+        # the event & new player overlays are redrawn below
+        [artist.remove() for artist in _get_artists(ax, "event_overlay")]
     plot_frame(
         tmp_df_dict,
         figax=(fig, ax),
@@ -352,7 +635,9 @@ def plot_pitchcontrol_for_event(
         PlayerAlpha=alpha,
         include_player_velocities=include_player_velocities,
         annotate=annotate,
+        update_artists=figax is not None,
     )
+    previous_artists = set(ax.get_children())
     plot_events(
         events.loc[event_id:event_id],
         figax=(fig, ax),
@@ -375,22 +660,43 @@ def plot_pitchcontrol_for_event(
             annotate=annotate,
             player_id=player_id,
         )
-        PPCF = -1 * PPCF
+        PPCF = np.negative(PPCF, dtype=np.float32) # a new array, so that the conversion below can overwrite it
+    [artist.set_gid("event_overlay") for artist in ax.get_children() if artist not in previous_artists]
 
     # If we need to apply a transformation to ensure the 0 points are white, apply the transformation
     if plotting_difference:
-        PPCF = convert_pitch_control_for_cmap(PPCF)
-
-    # plot pitch control surface
-    ax.imshow(
-        np.flipud(PPCF),
-        extent=(np.amin(xgrid), np.amax(xgrid), np.amin(ygrid), np.amax(ygrid)),
-        interpolation="lanczos",
-        vmin=0.0,
-        vmax=1.0,
-        alpha=alpha_pitch_control,
-        cmap=cmap,
-    )
+        PPCF = convert_pitch_control_for_cmap(PPCF, out=PPCF if plotting_new_location else None) # the negated copy is ours to overwrite
+
+    # very fine surfaces are thinned out first, the bilinear interpolation smooths them back out
+    step = int(max(1, np.ceil(PPCF.shape[0] / 130.0), np.ceil(PPCF.shape[1] / 200.0)))
+    if step > 1:
+        PPCF = PPCF[::step, ::step]
+        # the last sampled cells are not necessarily the last ones of the grids
+        xgrid, ygrid = xgrid[::step], ygrid[::step]
+    # a float32 image is resampled in single precision, which is plenty for display (a no-op for the difference surfaces)
+    PPCF = PPCF.astype(np.float32, copy=False)
+
+    # plot pitch control surface (rasterized, so that vector outputs keep the lines and text as vectors)
+    extent = (xgrid[0], xgrid[-1], ygrid[0], ygrid[-1]) # the grids are sorted, the first row of PPCF is at ygrid[0]
+    images = _get_artists(ax, "pitch_control") if figax is not None else []
+    if images:
+        images[0].set_data(PPCF)
+        images[0].set_extent(extent)
+        images[0].set_cmap(cmap)
+        images[0].set_alpha(alpha_pitch_control)
+    else:
+        ax.imshow(
+            PPCF,
+            extent=extent,
+            origin="lower",
+            interpolation="bilinear",
+            vmin=0.0,
+            vmax=1.0,
+            alpha=alpha_pitch_control,
+            cmap=cmap,
+            rasterized=True,
+            gid="pitch_control",
+        )
     return fig, ax
 
 
@@ -436,7 +742,7 @@ def plot_new_player(
         player_y_coordinate,
         color=color,
         marker="o",
-        MarkerSize=PlayerMarkerSize,
+        markersize=PlayerMarkerSize,
         alpha=PlayerAlpha,
     )
     if include_player_velocities:
@@ -464,7 +770,7 @@ def plot_new_player(
     return fig, ax
 
 
-def convert_pitch_control_for_cmap(pitch_control):
+def convert_pitch_control_for_cmap(pitch_control, out=None):
     """
     Function Description:
     This function converts a pitch control surface with negative values to a surface that can be used appropriately
@@ -480,24 +786,76 @@ def convert_pitch_control_for_cmap(pitch_control):
 
     Input parameters:
     :param pitch_control: An ndarray that represents the difference between two pitch control arrays
+    :param out: An optional float32 ndarray of the same shape that the adjusted surface is written to. It can be
+        ``pitch_control`` itself, if the difference is no longer needed. Default is None (a new array)
 
     Returns:
     :return: An adjusted surface to be passed into ``plot_pitch_control_for_event``
     """
-    min_value = pitch_control.min()
-    max_value = pitch_control.max()
-    quadratic_coef = (
-        0.5
-        * (min_value + max_value)
-        / ((max_value * min_value) * (max_value - min_value))
-    )
-    linear_coef = (
-        0.5
-        * (min_value ** 2 + max_value ** 2)
-        / ((min_value * max_value) * max_value * min_value)
-    )
-    constant_term = 0.5
-    quadratic_array = quadratic_coef * np.square(pitch_control)
-    linear_array = linear_coef * pitch_control
-    constant_array = constant_term + 0 * pitch_control
-    return quadratic_array + linear_array + constant_array
+    if out is None:
+        out = np.empty(pitch_control.shape, dtype=np.float32)
+    min_value = float(pitch_control.min())
+    max_value = float(pitch_control.max())
+    if min_value < 0 < max_value:
+        # solutions of q*min**2 + l*min = -0.5 and q*max**2 + l*max = 0.5
+        quadratic_coef = (
+            0.5
+            * (min_value + max_value)
+            / ((max_value * min_value) * (max_value - min_value))
+        )
+        linear_coef = (
+            -0.5
+            * (min_value ** 2 + max_value ** 2)
+            / ((min_value * max_value) * (max_value - min_value))
+        )
+        # the quadratic is only usable if it increases over the whole surface (i.e. min and max are not too lopsided)
+        if linear_coef + 2 * quadratic_coef * min_value >= 0 and linear_coef + 2 * quadratic_coef * max_value >= 0:
+            return _apply_quadratic(pitch_control, quadratic_coef, linear_coef, out=out)
+    # otherwise (or if the surface does not take both signs, where the system of equations is singular)
+    # scale it linearly around 0.5
+    scale = max(abs(min_value), abs(max_value))
+    return _apply_quadratic(pitch_control, 0.0, 0.5 / scale if scale > 0 else 0.0, out=out)
+
+
+if numba is not None:
+
+    def _quadratic(x, quadratic_coef, linear_coef):
+        """ quadratic_coef * x^2 + linear_coef * x + 0.5, for one element """
+        return (quadratic_coef * x + linear_coef) * x + 0.5
+
+    # compiled on first use rather than on import, as most callers never convert a surface for a cmap
+    _compiled_quadratic = None
+
+    def _apply_quadratic(x, quadratic_coef, linear_coef, out=None):
+        """
+        Function Description:
+        Evaluates ``quadratic_coef * x^2 + linear_coef * x + 0.5`` elementwise with a compiled parallel ufunc, used by
+        ``convert_pitch_control_for_cmap``.
+        """
+        global _compiled_quadratic
+        if _compiled_quadratic is None:
+            _compiled_quadratic = numba.vectorize(
+                [
+                    "float32(float32, float32, float32)",
+                    "float64(float64, float64, float64)",
+                ],
+                target="parallel",
+                fastmath=True,
+                cache=True,
+            )(_quadratic)
+        return _compiled_quadratic(x, quadratic_coef, linear_coef, out=out)
+
+else:
+
+    def _apply_quadratic(x, quadratic_coef, linear_coef, out=None):
+        """
+        Function Description:
+        Evaluates ``quadratic_coef * x^2 + linear_coef * x + 0.5`` elementwise, used by
+        ``convert_pitch_control_for_cmap``. The numpy fallback when numba is not installed, which needs a single
+        temporary array (so that ``out`` may also be ``x``).
+        """
+        adjusted_array = np.multiply(x, quadratic_coef, dtype=np.float32)
+        adjusted_array += linear_coef
+        out = np.multiply(adjusted_array, x, out=out, dtype=np.float32)
+        out += 0.5
+        return out
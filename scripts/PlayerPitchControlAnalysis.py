@@ -1,13 +1,64 @@
+import copy
+import multiprocessing
+import os
 import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 import Metrica_PitchControl as mpc
 import Metrica_Viz as mviz
 
 
+class TrackingData(object):
+    """
+    The tracking data of one team as numpy arrays, which is what ``PlayerPitchControlAnalysisPlayer`` evaluates the
+    pitch control model from (the DataFrames are only used for plotting). Building it once per match, rather than
+    once per analysis, saves converting the DataFrames for every event that is analyzed.
+
+    Initialization parameters:
+    :param np.ndarray positions: The players' positions (dimen (n_frames,n_players,2))
+    :param np.ndarray velocities: The players' velocities (dimen (n_frames,n_players,2))
+    :param list players: The player IDs, in the order of the second axis of ``positions`` and ``velocities``
+    :param frames: The frames, in the order of the first axis of ``positions`` and ``velocities``
+    """
+
+    def __init__(self, positions, velocities, players, frames):
+        self.positions = positions
+        self.velocities = velocities
+        self.players = list(players)
+        self.frame_to_idx = {frame: k for k, frame in enumerate(frames)}
+        self.player_to_idx = {pid: k for k, pid in enumerate(self.players)}
+
+    @classmethod
+    def from_dataframe(cls, df, team):
+        """
+        Builds the arrays (as float32) from a team's tracking DataFrame, with "{team}_{player}_x" (and _y, _vx and _vy)
+        columns for every player, indexed on the frame.
+        """
+        players = [
+            c.split("_")[1]
+            for c in df.columns
+            if c.startswith(f"{team}_") and c.endswith("_x")
+        ]
+
+        def stack(suffixes):
+            columns = [[f"{team}_{pid}_{suffix}" for pid in players] for suffix in suffixes]
+            return np.ascontiguousarray(
+                np.stack([df[c].to_numpy(dtype=np.float32) for c in columns], axis=-1)
+            )
+
+        return cls(stack(("x", "y")), stack(("vx", "vy")), players, df.index)
+
+
 class PlayerPitchControlAnalysisPlayer(object):
+    # new locations evaluated per integration by the batch methods (with the default grid, this bounds the tiled times
+    # to intercept of each call to ~20MB)
+    _LOCATION_BATCH_SIZE = 64
+    # edited surfaces kept per instance, the least recently used ones are dropped first
+    _CACHE_SIZE = 128
+
     def __init__(
         self,
         df_dict,
@@ -18,6 +69,7 @@ class PlayerPitchControlAnalysisPlayer(object):
         player_to_analyze,
         field_dimens=(106.0, 68.0),
         n_grid_cells_x=50,
+        tracking=None,
     ):
         """
         This class is used to consolidate many of the functions that would be used to analyze the impact of an
@@ -65,6 +117,8 @@ class PlayerPitchControlAnalysisPlayer(object):
         :param tuple field_dimens: tuple containing the length and width of the pitch in meters. Default is (106,68)
         :param int n_grid_cells_x: Number of pixels in the grid (in the x-direction) that covers the surface.
                 Default is 50. n_grid_cells_y will be calculated based on n_grid_cells_x and the field dimensions
+        :param dict tracking: keys=team_list, values=``TrackingData`` of the teams in ``df_dict``, e.g. to share them
+                between the analyses of many events. Default is None (built from ``df_dict``)
 
 
         """
@@ -76,17 +130,73 @@ class PlayerPitchControlAnalysisPlayer(object):
         self.player_to_analyze = player_to_analyze
         self.field_dimens = field_dimens
         self.n_grid_cells_x = n_grid_cells_x
+        self.n_grid_cells_y = int(n_grid_cells_x * field_dimens[1] / field_dimens[0])
+        # the model is evaluated into the same float64 grid every time, only the (float32) results are kept
+        self._scratch_grid = np.empty((self.n_grid_cells_y, self.n_grid_cells_x))
+        self._scratch_defending = np.empty(self._scratch_grid.size)
+        # edited pitch control surfaces, keyed on the function and (rounded) arguments that produced them (at most
+        # _CACHE_SIZE of them)
+        self._cache = OrderedDict()
+        # the parts of the model that do not depend on the analyzed player (see _pitch_control_background)
+        self._background = None
+        # the (fig, ax) of the last interactive plot_pitch_control_difference call
+        self._figax = None
+        # details of the event (frame, team in possession, ball start position), which are fixed for the instance, so the
+        # event's row is only looked up here
+        event = self.events.loc[self.event_id]
+        self._event_frame = int(event["Start Frame"])
+        self._team_with_possession = event["Team"]
+        self._ball_start_pos = np.array([event["Start X"], event["Start Y"]])
+        # player positions and velocities as numpy arrays for each team, so that the values at the event can be read
+        # (and overridden) by position instead of through pandas label lookups
+        if tracking is None:
+            tracking = {
+                team: TrackingData.from_dataframe(df, team)
+                for team, df in self.df_dict.items()
+            }
+        self.tracking = tracking
+        self._frame_index = {
+            team: tracking[team].frame_to_idx[self._event_frame] for team in tracking
+        }
+        self._defending_team = [
+            team for team in self.df_dict if team != self._team_with_possession
+        ][0]
+        self._other_team_players = {
+            team: self._initialise_players(team)
+            for team in self.df_dict
+            if team != self.team_player_to_analyze
+        }
+        # the players _validate_inputs accepts (an unknown team is reported there rather than here)
+        self._players_on_pitch = (
+            frozenset(self._get_players_on_pitch())
+            if self.team_player_to_analyze in self.df_dict
+            else frozenset()
+        )
+        # the analyzed player's position and velocity at the event, which every location change starts from (shared,
+        # so it must not be modified). None for an unknown team or player, which _validate_inputs reports
+        self._player_state = self._read_player_state()
+        # the grids only depend on the field dimensions and n_grid_cells_x, so the ones of the event's surface are
+        # returned with every edited surface too (and made read-only, as they are shared)
         (
             self.event_pitch_control,
             self.xgrid,
             self.ygrid,
-        ) = mpc.generate_pitch_control_for_event(
-            event_id=self.event_id,
-            events=self.events,
-            df_dict=self.df_dict,
-            params=self.params,
+        ) = self._generate_pitch_control()
+        self.xgrid.flags.writeable = False
+        self.ygrid.flags.writeable = False
+        # area of the pitch (in m^2) covered by each cell of the grid
+        self._cell_area = (
+            self.field_dimens[0]
+            * self.field_dimens[1]
+            / (len(self.xgrid) * len(self.ygrid))
         )
 
+    def __getstate__(self):
+        # the interactive figure stays in this process, sweep workers only evaluate surfaces
+        state = self.__dict__.copy()
+        state["_figax"] = None
+        return state
+
     def calculate_total_space_on_pitch_team(self, pitch_control_result):
         """
         Function Description:
@@ -100,12 +210,7 @@ class PlayerPitchControlAnalysisPlayer(object):
         :return: The number of meters occupied by the attacking team in a freeze frame of the data. Measured in m^2
         """
 
-        total_space_attacking = (
-            self.field_dimens[0]
-            * self.field_dimens[1]
-            * (pitch_control_result.sum())
-            / (len(self.xgrid) * len(self.ygrid))
-        )
+        total_space_attacking = _grid_sum(pitch_control_result) * self._cell_area
         return total_space_attacking
 
     def calculate_pitch_control_replaced_velocity(
@@ -132,36 +237,17 @@ class PlayerPitchControlAnalysisPlayer(object):
                 Surface for the defending team is simply 1-PPCFa.
         xgrid: Positions of the pixels in the x-direction (field length)
         ygrid: Positions of the pixels in the y-direction (field width)
+        The three arrays are read-only, as they are shared with the cache (and later calls with the same arguments),
+        so use ``.copy()`` on them before modifying them in place.
         """
         self._validate_inputs()
 
-        # Determine which row in the tracking dataframe to use
-        event_frame = self.events.loc[self.event_id]["Start Frame"]
-
         # Replace player's velocity datapoints with new velocity vector
-        tmp_df_dict = self.df_dict.copy()
-        for team, df in tmp_df_dict.items():
-            if team == self.team_player_to_analyze:
-                df_tmp = df.copy()
-                df_tmp.at[
-                    event_frame,
-                    f"{self.team_player_to_analyze}_{self.player_to_analyze}_vx",
-                ] = replace_x_velocity
-                df_tmp.at[
-                    event_frame,
-                    f"{self.team_player_to_analyze}_{self.player_to_analyze}_vy",
-                ] = replace_y_velocity
-                tmp_df_dict[team] = df_tmp
-
-        edited_pitch_control, xgrid, ygrid = mpc.generate_pitch_control_for_event(
-            event_id=self.event_id,
-            events=self.events,
-            df_dict=tmp_df_dict,
-            params=self.params,
-            field_dimen=self.field_dimens,
-            n_grid_cells_x=self.n_grid_cells_x,
+        return self._pitch_control_with_override(
+            ("movement", round(replace_x_velocity, 3), round(replace_y_velocity, 3)),
+            vx=replace_x_velocity,
+            vy=replace_y_velocity,
         )
-        return edited_pitch_control, xgrid, ygrid
 
     def calculate_pitch_control_without_player(self):
         """
@@ -176,43 +262,16 @@ class PlayerPitchControlAnalysisPlayer(object):
                 defending team is simply 1-PPCFa.
         xgrid: Positions of the pixels in the x-direction (field length)
         ygrid: Positions of the pixels in the y-direction (field width)
+        The three arrays are read-only, as they are shared with the cache (and later calls with the same arguments),
+        so use ``.copy()`` on them before modifying them in place.
         """
         self._validate_inputs()
-        event_frame = self.events.loc[self.event_id]["Start Frame"]
 
         # Replace player's datapoint nan's, so pitch control does not take into account
         # the player when computing its surface
-        tmp_df_dict = self.df_dict.copy()
-        for team, df in tmp_df_dict.items():
-            if team == self.team_player_to_analyze:
-                df_tmp = df.copy()
-                df_tmp.at[
-                    event_frame,
-                    f"{self.team_player_to_analyze}_{self.player_to_analyze}_x",
-                ] = np.nan
-                df_tmp.at[
-                    event_frame,
-                    f"{self.team_player_to_analyze}_{self.player_to_analyze}_y",
-                ] = np.nan
-                df_tmp.at[
-                    event_frame,
-                    f"{self.team_player_to_analyze}_{self.player_to_analyze}_vx",
-                ] = np.nan
-                df_tmp.at[
-                    event_frame,
-                    f"{self.team_player_to_analyze}_{self.player_to_analyze}_vy",
-                ] = np.nan
-                tmp_df_dict[team] = df_tmp
-
-        edited_pitch_control, xgrid, ygrid = mpc.generate_pitch_control_for_event(
-            event_id=self.event_id,
-            events=self.events,
-            df_dict=tmp_df_dict,
-            params=self.params,
-            field_dimen=self.field_dimens,
-            n_grid_cells_x=self.n_grid_cells_x,
+        return self._pitch_control_with_override(
+            ("presence",), x=np.nan, y=np.nan, vx=np.nan, vy=np.nan
         )
-        return edited_pitch_control, xgrid, ygrid
 
     def calculate_pitch_control_new_location(
         self,
@@ -252,49 +311,37 @@ class PlayerPitchControlAnalysisPlayer(object):
                Surface for the defending team is just 1-PPCFa.
         xgrid: Positions of the pixels in the x-direction (field length)
         ygrid: Positions of the pixels in the y-direction (field width)
+        The three arrays are read-only, as they are shared with the cache (and later calls with the same arguments),
+        so use ``.copy()`` on them before modifying them in place.
         """
         self._validate_inputs()
 
-        if replace_velocity & (replace_x_velocity == 0) & (replace_y_velocity == 0):
+        if replace_velocity and replace_x_velocity == 0 and replace_y_velocity == 0:
             warnings.warn(
                 "You have not specified a new velocity vector for the player. All analysis will assume "
                 "that the player is stationary in his/her new location"
             )
 
-        event_frame = self.events.loc[self.event_id]["Start Frame"]
+        # the velocity is only part of the key when it is replaced
+        cache_key = (
+            "location",
+            round(relative_x_change, 3),
+            round(relative_y_change, 3),
+        )
+        if replace_velocity:
+            cache_key += (round(replace_x_velocity, 3), round(replace_y_velocity, 3))
 
         # Replace datapoints with a new location and velocity vector
-        tmp_df_dict = self.df_dict.copy()
-        for team, df in tmp_df_dict.items():
-            if team == self.team_player_to_analyze:
-                df_tmp = df.copy()
-                df_tmp.at[
-                    event_frame,
-                    f"{self.team_player_to_analyze}_{self.player_to_analyze}_x",
-                ] = relative_x_change
-                df_tmp.at[
-                    event_frame,
-                    f"{self.team_player_to_analyze}_{self.player_to_analyze}_y",
-                ] = relative_y_change
-                df_tmp.at[
-                    event_frame,
-                    f"{self.team_player_to_analyze}_{self.player_to_analyze}_vx",
-                ] = replace_x_velocity
-                df_tmp.at[
-                    event_frame,
-                    f"{self.team_player_to_analyze}_{self.player_to_analyze}_vy",
-                ] = replace_y_velocity
-                tmp_df_dict[team] = df_tmp
-
-        edited_pitch_control, xgrid, ygrid = mpc.generate_pitch_control_for_event(
-            event_id=self.event_id,
-            events=self.events,
-            df_dict=tmp_df_dict,
-            params=self.params,
-            field_dimen=self.field_dimens,
-            n_grid_cells_x=self.n_grid_cells_x,
+        return self._pitch_control_with_override(
+            cache_key,
+            **self._location_overrides(
+                relative_x_change,
+                relative_y_change,
+                replace_velocity,
+                replace_x_velocity,
+                replace_y_velocity,
+            ),
         )
-        return edited_pitch_control, xgrid, ygrid
 
     def calculate_pitch_control_difference(
         self,
@@ -353,39 +400,17 @@ class PlayerPitchControlAnalysisPlayer(object):
             The difference surface for the defending team is simply 1-PPCFa.
             xgrid: Positions of the pixels in the x-direction (field length)
             ygrid: Positions of the pixels in the y-direction (field width)
+            The difference is a new array, but the grids are shared with every result of the instance, so they are
+            read-only.
         """
-        if replace_function == "movement":
-            (
-                edited_pitch_control,
-                xgrid,
-                ygrid,
-            ) = self.calculate_pitch_control_replaced_velocity(
-                replace_x_velocity=replace_x_velocity,
-                replace_y_velocity=replace_y_velocity,
-            )
-        elif replace_function == "presence":
-            (
-                edited_pitch_control,
-                xgrid,
-                ygrid,
-            ) = self.calculate_pitch_control_without_player()
-        elif replace_function == "location":
-            (
-                edited_pitch_control,
-                xgrid,
-                ygrid,
-            ) = self.calculate_pitch_control_new_location(
-                replace_velocity=replace_velocity,
-                replace_x_velocity=replace_x_velocity,
-                replace_y_velocity=replace_y_velocity,
-                relative_x_change=relative_x_change,
-                relative_y_change=relative_y_change,
-            )
-
-        else:
-            raise ValueError(
-                "replace_function must be either 'movement', 'presence' or 'location'"
-            )
+        edited_pitch_control, xgrid, ygrid = self._calculate_edited_pitch_control(
+            replace_velocity=replace_velocity,
+            replace_x_velocity=replace_x_velocity,
+            replace_y_velocity=replace_y_velocity,
+            relative_x_change=relative_x_change,
+            relative_y_change=relative_y_change,
+            replace_function=replace_function,
+        )
         pitch_control_difference = self.event_pitch_control - edited_pitch_control
         return pitch_control_difference, xgrid, ygrid
 
@@ -435,9 +460,7 @@ class PlayerPitchControlAnalysisPlayer(object):
             Positive values represent space lost by the player's team after editing the player's attributes,
              while negative values represent space gained after editing the player's attributes. Measured in m^2.
         """
-        team_with_possession = self.events.loc[self.event_id].Team
-
-        (pitch_control_difference, _, _,) = self.calculate_pitch_control_difference(
+        edited_pitch_control, _, _ = self._calculate_edited_pitch_control(
             replace_x_velocity=replace_x_velocity,
             replace_y_velocity=replace_y_velocity,
             relative_x_change=relative_x_change,
@@ -446,14 +469,172 @@ class PlayerPitchControlAnalysisPlayer(object):
             replace_velocity=replace_velocity,
         )
 
-        pitch_control_change = self.calculate_total_space_on_pitch_team(
-            pitch_control_difference
-        )
-        if team_with_possession == self.team_player_to_analyze:
+        # the sum of the difference is the difference of the sums, so the difference surface is not needed here
+        pitch_control_change = (
+            _grid_sum(self.event_pitch_control) - _grid_sum(edited_pitch_control)
+        ) * self._cell_area
+        if self._team_with_possession == self.team_player_to_analyze:
             return pitch_control_change
         else:
             return -1 * pitch_control_change
 
+    def sweep_locations(
+        self,
+        xs,
+        ys,
+        n_jobs=1,
+        replace_velocity=False,
+        replace_x_velocity=0,
+        replace_y_velocity=0,
+    ):
+        """
+        Function Description:
+        Calculates the space created by the player with ``replace_function='location'`` (see
+        ``calculate_space_created``) for every combination of a relative change in x from ``xs`` and a relative change
+        in y from ``ys``, e.g. to build a heatmap of the best locations for the player to be in.
+
+        Input parameters:
+        :param list xs: The values of ``relative_x_change`` to evaluate. Measured in meters.
+        :param list ys: The values of ``relative_y_change`` to evaluate. Measured in meters.
+        :param int n_jobs: Number of processes the locations are split over (None, or any value <= 0, uses all
+            cores). Each process evaluates one contiguous block of the locations with ``calculate_space_created_batch``,
+            on a copy of the analysis that only has what the model needs (no DataFrames or cached surfaces). Each process takes over a second to start, and with numba the integration already runs on
+            every core, so this only pays off for large sweeps with the numpy fallback on several cores. Default is 1
+            (all locations in this process)
+        :param bool replace_velocity: See ``calculate_pitch_control_new_location``. Default is False.
+        :param float replace_x_velocity: See ``calculate_pitch_control_new_location``. Default is 0.
+        :param float replace_y_velocity: See ``calculate_pitch_control_new_location``. Default is 0.
+
+        Returns:
+         A (len(xs), len(ys)) array, where element [i, j] is the space created with the player moved by
+            (xs[i], ys[j]). Measured in m^2.
+        """
+        relative_x_changes, relative_y_changes = np.meshgrid(xs, ys, indexing="ij")
+        velocity_kwargs = dict(
+            replace_velocity=replace_velocity,
+            replace_x_velocities=replace_x_velocity,
+            replace_y_velocities=replace_y_velocity,
+        )
+        if n_jobs is None or n_jobs <= 0:
+            n_jobs = os.cpu_count()
+        n_jobs = min(n_jobs, relative_x_changes.size)
+        if n_jobs <= 1:
+            return self.calculate_space_created_batch(
+                relative_x_changes, relative_y_changes, **velocity_kwargs
+            )
+        self._validate_inputs()
+        # computed before the analysis is sent to the workers, so that they share it rather than each building it
+        self._pitch_control_background()
+        blocks = np.array_split(np.arange(relative_x_changes.size), n_jobs)
+        # spawn, as forking once numba's threading layer is running can deadlock the workers
+        with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_sweep_worker,
+            initargs=(self._sweep_worker_copy(),),
+        ) as executor:
+            space_created = list(
+                executor.map(
+                    _sweep_space_created,
+                    [relative_x_changes.ravel()[block] for block in blocks],
+                    [relative_y_changes.ravel()[block] for block in blocks],
+                    [velocity_kwargs] * n_jobs,
+                )
+            )
+        return np.concatenate(space_created).reshape(relative_x_changes.shape)
+
+    def calculate_space_created_batch(
+        self,
+        relative_x_changes,
+        relative_y_changes,
+        replace_velocity=False,
+        replace_x_velocities=0,
+        replace_y_velocities=0,
+    ):
+        """
+        Function Description:
+        Calculates the space created by the player with ``replace_function='location'`` (see
+        ``calculate_space_created``) for many new locations and velocities at once, without storing each of the
+        edited surfaces in the cache.
+
+        Input parameters:
+        :param array relative_x_changes: The amounts to change the x coordinate of the player by. Measured in meters.
+        :param array relative_y_changes: The amounts to change the y coordinate of the player by. Measured in meters.
+        :param bool replace_velocity: See ``calculate_pitch_control_new_location``. Default is False.
+        :param array replace_x_velocities: The x vectors of the velocities to replace the player's with. Measured in
+            m/s. Default is 0.
+        :param array replace_y_velocities: The y vectors of the velocities to replace the player's with. Measured in
+            m/s. Default is 0.
+        The four arrays are broadcast against each other, so scalars apply to every point.
+
+        Returns:
+         An array (with the broadcast shape of the inputs) of the space gained (or lost) by the player's team at each
+            point, as returned by ``calculate_space_created``. Measured in m^2.
+        """
+        self._validate_inputs()
+        new_locations, shape = self._location_overrides_batch(
+            relative_x_changes,
+            relative_y_changes,
+            replace_velocity,
+            replace_x_velocities,
+            replace_y_velocities,
+        )
+        edited_pitch_control = self._pitch_control_for_player_batch(**new_locations)
+        event_space = _grid_sum(self.event_pitch_control) * self._cell_area
+        space_created = np.array(
+            [event_space - _grid_sum(grid) * self._cell_area for grid in edited_pitch_control]
+        )
+        if self._team_with_possession != self.team_player_to_analyze:
+            space_created = -1 * space_created
+        return space_created.reshape(shape)
+
+    def calculate_pitch_control_difference_batch(
+        self,
+        relative_x_changes,
+        relative_y_changes,
+        replace_velocity=False,
+        replace_x_velocities=0,
+        replace_y_velocities=0,
+    ):
+        """
+        Function Description:
+        Calculates the difference in pitch control surfaces with ``replace_function='location'`` (see
+        ``calculate_pitch_control_difference``) for many new locations and velocities at once, e.g. to compare the
+        spaces the player would create at each of a grid of candidate locations. The edited surfaces are not stored in
+        the cache.
+
+        Input parameters:
+        See ``calculate_space_created_batch``.
+
+        Returns:
+            pitch_control_difference: Array of the differences in pitch control surfaces at each point, of shape
+            (the broadcast shape of the inputs) + (n_grid_cells_y,n_grid_cells_x). Each is as returned by
+            ``calculate_pitch_control_difference``.
+            xgrid: Positions of the pixels in the x-direction (field length)
+            ygrid: Positions of the pixels in the y-direction (field width)
+            (as in ``calculate_pitch_control_difference``, only the grids are read-only)
+        """
+        self._validate_inputs()
+        new_locations, shape = self._location_overrides_batch(
+            relative_x_changes,
+            relative_y_changes,
+            replace_velocity,
+            replace_x_velocities,
+            replace_y_velocities,
+        )
+        pitch_control_difference = self._pitch_control_for_player_batch(**new_locations)
+        # the edited surfaces are not needed after this, so the differences overwrite them
+        np.subtract(
+            self.event_pitch_control,
+            pitch_control_difference,
+            out=pitch_control_difference,
+        )
+        return (
+            pitch_control_difference.reshape(shape + self.event_pitch_control.shape),
+            self.xgrid,
+            self.ygrid,
+        )
+
     def plot_pitch_control_difference(
         self,
         replace_x_velocity=0,
@@ -465,6 +646,7 @@ class PlayerPitchControlAnalysisPlayer(object):
         alpha=0.7,
         alpha_pitch_control=0.5,
         team_color_dict={"Home": "r", "Away": "b"},
+        interactive=False,
     ):
         """
         Function description:
@@ -509,11 +691,15 @@ class PlayerPitchControlAnalysisPlayer(object):
         :param float alpha: alpha (transparency) of player markers. Default is 0.7
         :param float alpha_pitch_control: alpha (transparency) of spaces heatmap. Default is 0.5
         :param dict team_color_dict:
-
+        :param bool interactive: If True, the figure of the previous interactive call is reused: the pitch is not drawn
+            again and only the players, the new location and the pitch control surface are updated, which is much
+            faster when exploring many changes one after the other. Default is False (a new figure for every call)
 
         Returns:
             This function technically does not return anything, but does produce a matplotlib plot.
         """
+        # unknown functions are rejected before anything is computed
+        self._validate_inputs(replace_function)
         (
             pitch_control_difference,
             xgrid,
@@ -527,130 +713,483 @@ class PlayerPitchControlAnalysisPlayer(object):
             replace_velocity=replace_velocity,
         )
 
-        if replace_function == "presence":
-            fig, ax = mviz.plot_pitchcontrol_for_event(
-                event_id=self.event_id,
-                events=self.events,
-                df_dict=self.df_dict,
-                PPCF=pitch_control_difference,
-                annotate=True,
-                xgrid=xgrid,
-                ygrid=ygrid,
-                plotting_presence=True,
-                team_to_plot=self.team_player_to_analyze,
-                alpha=alpha,
-                alpha_pitch_control=alpha_pitch_control,
-                team_color_dict=team_color_dict,
-            )
-        elif replace_function == "movement":
-
-            fig, ax = mviz.plot_pitchcontrol_for_event(
-                event_id=self.event_id,
-                events=self.events,
-                df_dict=self.df_dict,
-                PPCF=pitch_control_difference,
-                annotate=True,
-                xgrid=xgrid,
-                ygrid=ygrid,
-                plotting_difference=True,
-                alpha=alpha,
-                alpha_pitch_control=alpha_pitch_control,
-                team_color_dict=team_color_dict,
+        # the arguments shared by every replace_function, the handlers add their own flags
+        plot_kwargs = dict(
+            event_id=self.event_id,
+            events=self.events,
+            df_dict=self.df_dict,
+            PPCF=pitch_control_difference,
+            annotate=True,
+            xgrid=xgrid,
+            ygrid=ygrid,
+            alpha=alpha,
+            alpha_pitch_control=alpha_pitch_control,
+            team_color_dict=team_color_dict,
+            figax=self._figax if interactive else None,
+        )
+        fig, ax = self._PLOT_DISPATCH[replace_function](
+            self,
+            plot_kwargs,
+            relative_x_change,
+            relative_y_change,
+            replace_velocity,
+            replace_x_velocity,
+            replace_y_velocity,
+        )
+        title = self._TITLES[replace_function].format(
+            team=self.team_player_to_analyze,
+            player=self.player_to_analyze,
+            event_id=self.event_id,
+        )
+        ax.set_title(title, fontdict={"fontsize": 18})
+        if interactive:
+            self._figax = (fig, ax)
+
+        return fig, ax
+
+    def _plot_presence(self, plot_kwargs, *location_args):
+        return mviz.plot_pitchcontrol_for_event(
+            plotting_presence=True,
+            team_to_plot=self.team_player_to_analyze,
+            **plot_kwargs,
+        )
+
+    def _plot_movement(self, plot_kwargs, *location_args):
+        return mviz.plot_pitchcontrol_for_event(plotting_difference=True, **plot_kwargs)
+
+    def _plot_location(self, plot_kwargs, *location_args):
+        # the same position and velocity the edited surface was calculated with, from the tracking arrays
+        new_location = self._location_overrides(*location_args)
+        return mviz.plot_pitchcontrol_for_event(
+            plotting_new_location=True,
+            plotting_difference=True,
+            player_id=self.player_to_analyze,
+            player_x_coordinate=new_location["x"],
+            player_y_coordinate=new_location["y"],
+            player_x_velocity=new_location["vx"],
+            player_y_velocity=new_location["vy"],
+            **plot_kwargs,
+        )
+
+    # plot_pitch_control_difference's handlers (called with the instance) and titles for each replace_function
+    _PLOT_DISPATCH = {
+        "presence": _plot_presence,
+        "movement": _plot_movement,
+        "location": _plot_location,
+    }
+    _TITLES = {
+        "presence": "Space occupied by {team} Player {player} during event {event_id}",
+        "movement": "Space created by {team} Player {player} during event {event_id}",
+        "location": "Difference In Pitch Control After Moving {team} Player {player}",
+    }
+
+    def _calculate_edited_pitch_control(
+        self,
+        replace_velocity=False,
+        replace_x_velocity=0,
+        replace_y_velocity=0,
+        relative_x_change=0,
+        relative_y_change=0,
+        replace_function="movement",
+    ):
+        """
+        Function Description:
+        Calculates the edited pitch control surface for the given ``replace_function`` (see
+        ``calculate_pitch_control_difference`` for the arguments), using the relevant parent pitch control function.
+
+        Returns:
+        :return: The tuple (edited_pitch_control, xgrid, ygrid)
+        """
+        if replace_function == "movement":
+            (
+                edited_pitch_control,
+                xgrid,
+                ygrid,
+            ) = self.calculate_pitch_control_replaced_velocity(
+                replace_x_velocity=replace_x_velocity,
+                replace_y_velocity=replace_y_velocity,
             )
+        elif replace_function == "presence":
+            (
+                edited_pitch_control,
+                xgrid,
+                ygrid,
+            ) = self.calculate_pitch_control_without_player()
         elif replace_function == "location":
-            event_frame = self.events.loc[self.event_id]["Start Frame"]
-            x_coordinate = (
-                self.df_dict[self.team_player_to_analyze].loc[event_frame][
-                    f"{self.team_player_to_analyze}_{self.player_to_analyze}_x"
-                ]
-                + relative_x_change
+            (
+                edited_pitch_control,
+                xgrid,
+                ygrid,
+            ) = self.calculate_pitch_control_new_location(
+                replace_velocity=replace_velocity,
+                replace_x_velocity=replace_x_velocity,
+                replace_y_velocity=replace_y_velocity,
+                relative_x_change=relative_x_change,
+                relative_y_change=relative_y_change,
+            )
+
+        else:
+            raise ValueError(
+                "replace_function must be either 'movement', 'presence' or 'location'"
             )
-            y_coordinate = (
-                self.df_dict[self.team_player_to_analyze].loc[event_frame][
-                    f"{self.team_player_to_analyze}_{self.player_to_analyze}_y"
+        return edited_pitch_control, xgrid, ygrid
+
+    def _location_overrides(
+        self,
+        relative_x_change,
+        relative_y_change,
+        replace_velocity,
+        replace_x_velocity,
+        replace_y_velocity,
+    ):
+        """
+        Function Description:
+        The values the analyzed player's position and velocity are replaced with at the frame of the event by
+        ``calculate_pitch_control_new_location``: the player's position moved by the relative changes, and either the
+        new velocity (if ``replace_velocity``) or the player's own one.
+
+        Returns:
+        :return: dict with keys "x", "y", "vx" and "vy" (see ``_pitch_control_with_override``)
+        """
+        state = self._player_state
+        if not replace_velocity:
+            replace_x_velocity, replace_y_velocity = state["vx"], state["vy"]
+        return {
+            "x": state["x"] + relative_x_change,
+            "y": state["y"] + relative_y_change,
+            "vx": replace_x_velocity,
+            "vy": replace_y_velocity,
+        }
+
+    def _location_overrides_batch(
+        self,
+        relative_x_changes,
+        relative_y_changes,
+        replace_velocity,
+        replace_x_velocities,
+        replace_y_velocities,
+    ):
+        """
+        Function Description:
+        ``_location_overrides`` for the arrays of the batch methods, which are broadcast against each other (warning if
+        the player is made stationary at any of the points).
+
+        Returns:
+        :return: The tuple (overrides, shape): a dict with keys "x", "y", "vx" and "vy" of 1-d arrays (one value per
+            point), and the broadcast shape of the inputs
+        """
+        points = np.broadcast_arrays(
+            relative_x_changes,
+            relative_y_changes,
+            replace_x_velocities,
+            replace_y_velocities,
+        )
+        if replace_velocity and np.any((points[2] == 0) & (points[3] == 0)):
+            warnings.warn(
+                "You have not specified a new velocity vector for the player. All analysis will assume "
+                "that the player is stationary in his/her new location"
+            )
+        dx, dy, vx, vy = (point.ravel() for point in points)
+        overrides = self._location_overrides(dx, dy, replace_velocity, vx, vy)
+        return (
+            {key: np.broadcast_to(value, dx.shape) for key, value in overrides.items()},
+            points[0].shape,
+        )
+
+    def _pitch_control_with_override(self, cache_key, x=None, y=None, vx=None, vy=None):
+        """
+        Function Description:
+        Calculates the pitch control surface with the analyzed player's position and/or velocity at the frame of the
+        event replaced, which every ``calculate_pitch_control_*`` method goes through. The surface is cached under
+        ``cache_key``, and returned from the cache if it has already been calculated. The tracking data arrays are
+        not modified.
+
+        Input Parameters:
+        :param tuple cache_key: Key identifying the replacement (the method and its rounded arguments)
+        :param float x: New x coordinate of the player (NaN removes the player from the pitch). None keeps the current
+            one. Likewise for ``y``, ``vx`` and ``vy``.
+
+        Returns:
+        :return: The tuple (edited_pitch_control, xgrid, ygrid)
+        """
+        if cache_key in self._cache:
+            self._cache.move_to_end(cache_key)
+            return self._cache[cache_key]
+        state = dict(self._player_state)
+        for key, value in (("x", x), ("y", y), ("vx", vx), ("vy", vy)):
+            if value is not None:
+                state[key] = value
+        edited_pitch_control = self._pitch_control_for_player(**state)
+        return self._cache_pitch_control(
+            cache_key, edited_pitch_control, self.xgrid, self.ygrid
+        )
+
+    def _pitch_control_background(self):
+        """
+        Function Description:
+        The parts of the pitch control model at the frame of the event that do not depend on the analyzed player:
+        the positions of the cells of the grid, the ball travel time to each of them, and the times to intercept (with
+        the tti_sigma) of every other player for each team. Calculated on the first call and kept in ``_background``.
+
+        Returns:
+        :return: dict with keys "target_positions", "ball_travel_time", "tti" and "sigma" (the last two keyed on team)
+        """
+        if self._background is None:
+            target_positions = np.column_stack(
+                [
+                    np.tile(self.xgrid, len(self.ygrid)),
+                    np.repeat(self.ygrid, len(self.xgrid)),
                 ]
-                + relative_y_change
             )
-            if not replace_velocity:
-                replace_x_velocity = self.df_dict[self.team_player_to_analyze].loc[
-                    event_frame
-                ][f"{self.team_player_to_analyze}_{self.player_to_analyze}_vx"]
-                replace_y_velocity = self.df_dict[self.team_player_to_analyze].loc[
-                    event_frame
-                ][f"{self.team_player_to_analyze}_{self.player_to_analyze}_vy"]
-
-            fig, ax = mviz.plot_pitchcontrol_for_event(
-                event_id=self.event_id,
-                events=self.events,
-                df_dict=self.df_dict,
-                PPCF=pitch_control_difference,
-                annotate=True,
-                xgrid=xgrid,
-                ygrid=ygrid,
-                plotting_new_location=True,
-                plotting_difference=True,
-                player_id=self.player_to_analyze,
-                player_x_coordinate=x_coordinate,
-                player_y_coordinate=y_coordinate,
-                player_x_velocity=replace_x_velocity,
-                player_y_velocity=replace_y_velocity,
-                alpha=alpha,
-                alpha_pitch_control=alpha_pitch_control,
-                team_color_dict=team_color_dict,
+            background = {
+                "target_positions": target_positions,
+                "ball_travel_time": mpc.calculate_ball_travel_times(
+                    target_positions, self._ball_start_pos, self.params
+                ),
+                "tti": {},
+                "sigma": {},
+            }
+            team, player_id = self.team_player_to_analyze, str(self.player_to_analyze)
+            players = dict(self._other_team_players)
+            players[team] = [p for p in self._initialise_players(team) if p.id != player_id]
+            tti, sigma = background["tti"], background["sigma"]
+            for t, team_players in players.items():
+                tti[t], sigma[t] = mpc.calculate_times_to_intercept(
+                    target_positions, team_players
+                )
+            self._background = background
+        return self._background
+
+    def _read_player_state(self):
+        """
+        Function Description:
+        Reads the analyzed player's position and velocity at the frame of the event from the tracking arrays.
+
+        Returns:
+        :return: dict with keys "x", "y", "vx" and "vy", or None if the team or player is not in the tracking data
+        """
+        team = self.team_player_to_analyze
+        if team not in self.tracking:
+            return None
+        tracking = self.tracking[team]
+        player = tracking.player_to_idx.get(str(self.player_to_analyze))
+        if player is None:
+            return None
+        x, y = tracking.positions[self._frame_index[team], player]
+        vx, vy = tracking.velocities[self._frame_index[team], player]
+        return {"x": x, "y": y, "vx": vx, "vy": vy}
+
+    def _pitch_control_for_player(self, x, y, vx, vy):
+        """
+        Function Description:
+        Evaluates the pitch control surface at the frame of the event with the analyzed player at the given position
+        and velocity (a NaN position removes the player from the pitch). Only the player's times to intercept are
+        calculated, those of every other player (and the ball travel times) come from ``_pitch_control_background``.
+
+        Returns:
+        :return: The float32 pitch control surface for the attacking team (dimen (n_grid_cells_y,n_grid_cells_x))
+        """
+        background = self._pitch_control_background()
+        team = self.team_player_to_analyze
+        player = mpc.initialise_players_from_arrays(
+            [str(self.player_to_analyze)],
+            # (rounded to float32, like the tracking data arrays)
+            np.array([[x, y]], dtype=np.float32),
+            np.array([[vx, vy]], dtype=np.float32),
+            team,
+            self.params,
+        )
+        tti, sigma = mpc.calculate_times_to_intercept(
+            background["target_positions"], player
+        )
+        tti_background, sigma_background = background["tti"], background["sigma"]
+        times = {t: (tti_background[t], sigma_background[t]) for t in self.tracking}
+        times[team] = (
+            np.concatenate([tti_background[team], tti]),
+            np.concatenate([sigma_background[team], sigma]),
+        )
+        ppcf_att, ppcf_def = mpc.integrate_pitch_control(
+            *times[self._team_with_possession],
+            *times[self._defending_team],
+            background["ball_travel_time"],
+            self.params,
+            out=(self._scratch_grid.ravel(), self._scratch_defending),
+        )
+        # check probabilitiy sums within convergence
+        checksum = (ppcf_att.sum() + ppcf_def.sum()) / float(ppcf_att.size)
+        assert 1 - checksum < self.params["model_converge_tol"], (
+            "Checksum failed: %1.3f" % (1 - checksum)
+        )
+        # probabilities don't need double precision, so the surfaces (and their differences) are stored as float32 to
+        # halve their memory. Areas are still summed in float64
+        return self._scratch_grid.astype(np.float32)
+
+    def _pitch_control_for_player_batch(self, x, y, vx, vy):
+        """
+        Function Description:
+        ``_pitch_control_for_player`` for 1-d arrays of positions and velocities of the analyzed player. The targets of
+        up to ``_LOCATION_BATCH_SIZE`` of them are tiled into one integration, with the times to intercept of the other
+        players repeated for each, and the player's own times calculated for all of them at once.
+
+        Returns:
+        :return: The float32 pitch control surfaces for the attacking team (dimen (n,n_grid_cells_y,n_grid_cells_x))
+        """
+        background = self._pitch_control_background()
+        team = self.team_player_to_analyze
+        tti_background, sigma_background = background["tti"], background["sigma"]
+        pitch_control = np.empty(
+            (len(x),) + self._scratch_grid.shape, dtype=np.float32
+        )
+        for start in range(0, len(x), self._LOCATION_BATCH_SIZE):
+            batch = slice(start, start + self._LOCATION_BATCH_SIZE)
+            n = len(x[batch])
+            players = mpc.initialise_players_from_arrays(
+                [str(self.player_to_analyze)] * n,
+                # (rounded to float32, like the tracking data arrays)
+                np.column_stack([x[batch], y[batch]]).astype(np.float32),
+                np.column_stack([vx[batch], vy[batch]]).astype(np.float32),
+                team,
+                self.params,
             )
-        if replace_function == "movement":
-            plt.title(
-                "Space created by "
-                + str(self.team_player_to_analyze)
-                + " Player "
-                + str(self.player_to_analyze)
-                + " during event "
-                + str(self.event_id),
-                fontdict={"fontsize": 18},
+            # (n, n_targets), flattened below in the same order as the tiled targets
+            tti, sigma = mpc.calculate_times_to_intercept(
+                background["target_positions"], players
             )
-        elif replace_function == "presence":
-            plt.title(
-                "Space occupied by "
-                + str(self.team_player_to_analyze)
-                + " Player "
-                + str(self.player_to_analyze)
-                + " during event "
-                + str(self.event_id),
-                fontdict={"fontsize": 18},
+            times = {
+                t: (np.tile(tti_background[t], n), sigma_background[t])
+                for t in self.tracking
+            }
+            times[team] = (
+                np.concatenate([times[team][0], tti.reshape(1, -1)]),
+                np.concatenate([sigma_background[team], sigma[:1]]),
             )
-        elif replace_function == "location":
-            plt.title(
-                "Difference In Pitch Control After Moving "
-                + str(self.team_player_to_analyze)
-                + " Player "
-                + str(self.player_to_analyze),
-                fontdict={"fontsize": 18},
+            ppcf_att, ppcf_def = mpc.integrate_pitch_control(
+                *times[self._team_with_possession],
+                *times[self._defending_team],
+                np.tile(background["ball_travel_time"], n),
+                self.params,
             )
+            # check probabilitiy sums within convergence, for each of the surfaces
+            checksum = (ppcf_att + ppcf_def).reshape(n, -1).mean(axis=1)
+            assert np.all(1 - checksum < self.params["model_converge_tol"]), (
+                "Checksum failed: %1.3f" % (1 - checksum.min())
+            )
+            pitch_control[batch] = ppcf_att.reshape((n,) + self._scratch_grid.shape)
+        return pitch_control
 
-        return fig, ax
+    def _generate_pitch_control(self):
+        """
+        Function Description:
+        Evaluates the pitch control surface at the frame of the event from the position and velocity arrays, for every
+        player (the edited surfaces, which only move the analyzed player, are evaluated by
+        ``_pitch_control_for_player``).
 
-    def _get_players_on_pitch(self):
-        pass_frame = self.events.loc[self.event_id]["Start Frame"]
-        players_on_pitch = []
+        Returns:
+        :return: The tuple (pitch_control, xgrid, ygrid), as returned by ``mpc.generate_pitch_control_for_players`` (with
+            pitch_control as float32)
+        """
+        players = dict(self._other_team_players)
+        if self.team_player_to_analyze in self.df_dict:
+            players[self.team_player_to_analyze] = self._initialise_players(
+                self.team_player_to_analyze
+            )
+        pitch_control, xgrid, ygrid = mpc.generate_pitch_control_for_players(
+            players[self._team_with_possession],
+            players[self._defending_team],
+            self._ball_start_pos,
+            self.params,
+            field_dimen=self.field_dimens,
+            n_grid_cells_x=self.n_grid_cells_x,
+            out=self._scratch_grid,
+        )
+        # (stored as float32, like the edited surfaces)
+        return pitch_control.astype(np.float32), xgrid, ygrid
 
-        data_row = self.df_dict[self.team_player_to_analyze].loc[pass_frame]
+    def _initialise_players(self, team):
+        tracking, frame = self.tracking[team], self._frame_index[team]
+        return mpc.initialise_players_from_arrays(
+            tracking.players,
+            tracking.positions[frame],
+            tracking.velocities[frame],
+            team,
+            self.params,
+        )
 
-        for index in data_row.index:
-            if "_vx" in index:
-                if not np.isnan(data_row.loc[index]):
-                    players_on_pitch.append(index.split("_")[1])
-        return players_on_pitch
+    def _cache_pitch_control(self, cache_key, edited_pitch_control, xgrid, ygrid):
+        """
+        Function Description:
+        Stores an edited pitch control surface (and its grids) under ``cache_key``, so that repeated calls with the
+        same arguments (e.g. when sweeping over velocities or locations) do not recompute the surface. The surface is
+        made read-only, as it is shared between the calls. Once ``_CACHE_SIZE`` surfaces are stored, the least recently
+        used one is dropped.
 
-    def _validate_inputs(self):
-        if type(self.player_to_analyze) not in (str, int):
+        Returns:
+        :return: The tuple (edited_pitch_control, xgrid, ygrid)
+        """
+        edited_pitch_control.flags.writeable = False
+        self._cache[cache_key] = (edited_pitch_control, xgrid, ygrid)
+        if len(self._cache) > self._CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return self._cache[cache_key]
+
+    def _sweep_worker_copy(self):
+        """
+        Function Description:
+        A shallow copy of the analysis to send to the ``sweep_locations`` workers, without the DataFrames, the events
+        and the cached surfaces, which ``calculate_space_created_batch`` does not use, so that only the tracking data
+        arrays, ``_background``, ``_player_state``, the params and the grids are pickled for each worker.
+
+        Returns:
+        :return: The copy, which can only evaluate (uncached) surfaces, rather than plot them
+        """
+        worker = copy.copy(self)
+        worker.df_dict = None
+        worker.events = None
+        worker._cache = OrderedDict()
+        return worker
+
+    def _get_players_on_pitch(self):
+        team = self.team_player_to_analyze
+        tracking = self.tracking[team]
+        # players are on the pitch when they have a velocity at the event, read from the row of the tracking arrays
+        on_pitch = ~np.isnan(tracking.velocities[self._frame_index[team], :, 0])
+        return [tracking.players[k] for k in np.flatnonzero(on_pitch)]
+
+    def _validate_inputs(self, replace_function=None):
+        if replace_function is not None and replace_function not in self._PLOT_DISPATCH:
+            raise ValueError(
+                "replace_function must be either 'movement', 'presence' or 'location'"
+            )
+
+        if not isinstance(self.player_to_analyze, (str, int)):
             raise ValueError("player_to_analyze must be an integer or a string")
 
-        if self.team_player_to_analyze not in list(self.df_dict.keys()):
+        if self.team_player_to_analyze not in self.tracking:
             raise ValueError(
-                f"team_player_to_analyze must equal {list(self.df_dict.keys())}"
+                f"team_player_to_analyze must be one of {list(self.tracking)}"
             )
 
-        if str(self.player_to_analyze) not in self._get_players_on_pitch():
+        if str(self.player_to_analyze) not in self._players_on_pitch:
             raise ValueError(
                 "player_to_analyze is either not on the correct team, or was not on the pitch at the time of the event"
             )
+
+
+def _grid_sum(grid):
+    """ float64 sum of every cell in a grid, as one flat reduction over contiguous memory """
+    return float(np.add.reduce(np.ascontiguousarray(grid), axis=None, dtype=np.float64))
+
+
+# the analysis each sweep worker evaluates its block of locations on
+_sweep_analysis = None
+
+
+def _init_sweep_worker(analysis):
+    global _sweep_analysis
+    _sweep_analysis = analysis
+
+
+def _sweep_space_created(relative_x_changes, relative_y_changes, velocity_kwargs):
+    return _sweep_analysis.calculate_space_created_batch(
+        relative_x_changes, relative_y_changes, **velocity_kwargs
+    )
@@ -28,13 +28,15 @@ def read_dataset(base_dir, play, args):
         )
         for infile in infile_list
     }
-    # rename columns
+    # rename columns, and store the positions and velocities as float32 (plenty for cm-scale data, at half the memory)
     for team, df in df_dict.items():
         df.columns = [
             c if c in ["Time [s]", "ball_x", "ball_y"] else f"{team}_{c}"
             for c in df.columns
         ]
-        df_dict[team] = df
+        df_dict[team] = df.astype(
+            {c: np.float32 for c in df.columns if df[c].dtype == np.float64}
+        )
 
     color_dict = {
         infile.replace(".csv", "")
@@ -106,20 +108,21 @@ class LiverpoolAnalyzer:
         # sort player num based on end location
         end_frame = events_df.at[event_id, "End Frame"]
         ball_loc = events_df.loc[event_id, ["End X", "End Y"]].values
-        player_num_list = list(
-            set([c.split("_")[1] for c in df_dict[team].columns if c.startswith(team)])
-        )
-        sorted_index = np.argsort(
-            [
-                np.linalg.norm(
-                    df_dict[team]
-                    .loc[end_frame, [f"{team}_{player_num}_{c}" for c in ["x", "y"]]]
-                    .values
-                    - ball_loc
-                )
-                for player_num in player_num_list
-            ]
+        # each player has one "{team}_{player_num}_x" column, so their positions are read in one lookup
+        x_columns = [
+            c
+            for c in df_dict[team].columns
+            if c.startswith(f"{team}_") and c.endswith("_x")
+        ]
+        player_num_list = [c.split("_")[1] for c in x_columns]
+        positions = (
+            df_dict[team]
+            .loc[end_frame, x_columns + [c[:-1] + "y" for c in x_columns]]
+            .to_numpy(dtype=float)
+            .reshape(2, -1)
+            .T
         )
+        sorted_index = np.argsort(np.linalg.norm(positions - ball_loc, axis=1))
         player_num = st.selectbox(
             "Select a player number for analysis",
             np.array(player_num_list)[sorted_index],